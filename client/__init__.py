@@ -0,0 +1,5 @@
+"""Asynchronous Python client of the University contracts."""
+from .cache import LRUCache
+from .multicall import CallReverted, Multicall
+from .transactions import TransactionFailed, TransactionPipeline
+from .university import UniversityClient, load_abis
@@ -0,0 +1,84 @@
+import asyncio
+
+from eth_utils.abi import collapse_if_tuple
+from web3 import Web3
+
+# selector of Error(string), the encoding of require messages
+ERROR_SELECTOR = bytes.fromhex("08c379a0")
+
+
+class CallReverted(Exception):
+    """Raised by a batched view call which reverted, with the revert `reason` (None for a bare require)."""
+
+    def __init__(self, reason=None):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Multicall:
+    """Batches the view calls made in the same tick of the event loop into one `Multicall.tryAggregate` call.
+
+    `call` returns the decoded result of a web3 contract function as `ContractFunction.call` would.
+    The batch is sent once every caller scheduled in the tick has queued its call, at most
+    `max_batch` calls per request.
+    """
+
+    def __init__(self, contract, max_batch=500):
+        self.contract = contract
+        self.max_batch = max_batch
+        # number of sent aggregate requests and of the calls in them
+        self.batches = 0
+        self.calls = 0
+        self._pending = []
+
+    async def call(self, function):
+        future = asyncio.get_running_loop().create_future()
+        if not self._pending:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self._pending.append((function, future))
+        return await future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch):
+            asyncio.ensure_future(self._aggregate(pending[start:start + self.max_batch]))
+
+    async def _aggregate(self, batch):
+        self.batches += 1
+        self.calls += len(batch)
+        try:
+            _, results = await self.contract.functions.tryAggregate(
+                [(function.address, function._encode_transaction_data()) for function, _ in batch]).call()
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (function, future), (success, data) in zip(batch, results):
+            if future.done():
+                continue
+            if success:
+                future.set_result(self._decode(function, data))
+            else:
+                future.set_exception(CallReverted(_revert_reason(function, data)))
+
+    def _decode(self, function, data):
+        outputs = function.abi["outputs"]
+        values = function.w3.codec.decode([collapse_if_tuple(output) for output in outputs], data)
+        values = [_normalize(output["type"], value) for output, value in zip(outputs, values)]
+        return values[0] if len(values) == 1 else tuple(values)
+
+
+def _normalize(abi_type, value):
+    # the codec returns lowercase addresses, the contract calls of web3 return checksum ones
+    if abi_type == "address":
+        return Web3.to_checksum_address(value)
+    if abi_type == "address[]":
+        return [Web3.to_checksum_address(item) for item in value]
+    return value
+
+
+def _revert_reason(function, data):
+    if data[:4] != ERROR_SELECTOR:
+        return None
+    return function.w3.codec.decode(["string"], data[4:])[0]
@@ -0,0 +1,64 @@
+import asyncio
+
+
+class TransactionFailed(Exception):
+    """Raised when a mined transaction has a failed status."""
+
+    def __init__(self, receipt):
+        super().__init__(f"transaction {receipt['transactionHash'].hex()} failed")
+        self.receipt = receipt
+
+
+class TransactionPipeline:
+    """Sends transactions of an account back to back with locally assigned nonces.
+
+    `send` returns as soon as the node accepted the transaction, the receipts are awaited
+    separately, so bulk operations do not wait for every receipt in turn. Without a
+    `private_key` the node signs for `account` (an unlocked development account).
+    """
+
+    def __init__(self, w3, account, private_key=None, timeout=120, poll_latency=0.1):
+        self.w3 = w3
+        self.account = account
+        self.private_key = private_key
+        self.timeout = timeout
+        self.poll_latency = poll_latency
+        self._nonce = None
+        # keeps the nonces in the order of submission
+        self._lock = asyncio.Lock()
+
+    async def send(self, function, gas=None):
+        """Submits the transaction of a web3 contract function call and returns its hash."""
+        async with self._lock:
+            if self._nonce is None:
+                self._nonce = await self.w3.eth.get_transaction_count(self.account, "pending")
+            transaction = {"from": self.account, "nonce": self._nonce}
+            if gas is not None:
+                transaction["gas"] = gas
+            try:
+                transaction = await function.build_transaction(transaction)
+                if self.private_key is None:
+                    tx_hash = await self.w3.eth.send_transaction(transaction)
+                else:
+                    signed = self.w3.eth.account.sign_transaction(transaction, self.private_key)
+                    tx_hash = await self.w3.eth.send_raw_transaction(signed.raw_transaction)
+            except Exception:
+                # the nonce may be taken or not, it is asked from the node again
+                self._nonce = None
+                raise
+            self._nonce += 1
+            return tx_hash
+
+    async def wait(self, tx_hash):
+        receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash, self.timeout, self.poll_latency)
+        if receipt["status"] != 1:
+            raise TransactionFailed(receipt)
+        return receipt
+
+    async def transact(self, function, gas=None):
+        return await self.wait(await self.send(function, gas))
+
+    async def transact_many(self, functions, gas=None):
+        """Sends every transaction before waiting for any receipt, returns the receipts in order."""
+        tx_hashes = [await self.send(function, gas) for function in functions]
+        return await asyncio.gather(*(self.wait(tx_hash) for tx_hash in tx_hashes))
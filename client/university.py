@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+
+from .cache import LRUCache
+from .multicall import Multicall
+from .transactions import TransactionPipeline
+
+# compiled artifacts of the project, written by `brownie compile`
+BUILD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build", "contracts")
+CONTRACTS = ("University", "Semester", "Person", "Student", "CourseCatalog", "Degree", "Multicall")
+
+
+def load_abis(build_path=BUILD_PATH):
+    abis = {}
+    for name in CONTRACTS:
+        with open(os.path.join(build_path, f"{name}.json")) as artifact:
+            abis[name] = json.load(artifact)["abi"]
+    return abis
+
+
+class UniversityClient:
+    """Asynchronous client of a University deployment.
+
+    The handles of the registries are resolved once by `connect`, the ones of the semesters are
+    kept in an LRU cache keyed by the semester id. Every view call made through `call` is batched
+    by the Multicall deployment at `multicall_address`, the transactions of `account` are sent
+    through a TransactionPipeline.
+    """
+
+    def __init__(self, w3, university_address, multicall_address, account=None, private_key=None,
+                 abis=None, cache_size=32):
+        self.w3 = w3
+        self.abis = abis or load_abis()
+        self.university = self._contract("University", university_address)
+        self.multicall = Multicall(self._contract("Multicall", multicall_address))
+        self.transactions = TransactionPipeline(w3, account, private_key) if account else None
+        self.teacher = None
+        self.student = None
+        self.course_catalog = None
+        self.degree = None
+        # semester id - task resolving the semester handle
+        self._semesters = LRUCache(cache_size)
+
+    async def connect(self):
+        teacher, student, course_catalog, degree = await asyncio.gather(
+            self.call(self.university.functions.teacher()),
+            self.call(self.university.functions.student()),
+            self.call(self.university.functions.courseCatalog()),
+            self.call(self.university.functions.degree()),
+        )
+        self.teacher = self._contract("Person", teacher)
+        self.student = self._contract("Student", student)
+        self.course_catalog = self._contract("CourseCatalog", course_catalog)
+        self.degree = self._contract("Degree", degree)
+        return self
+
+    async def call(self, function):
+        """Result of a view call, batched with the other calls of the same tick."""
+        return await self.multicall.call(function)
+
+    async def semester(self, semester_id):
+        # the task is cached, so concurrent lookups of the same semester resolve it once
+        task = self._semesters.get(semester_id)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_semester(semester_id))
+            self._semesters.put(semester_id, task)
+        try:
+            return await task
+        except Exception:
+            self._semesters.pop(semester_id)
+            raise
+
+    async def current_semester(self):
+        return await self.semester(await self.call(self.university.functions.semesterId()))
+
+    async def transact(self, function, gas=None):
+        return await self.transactions.transact(function, gas)
+
+    async def transact_many(self, functions, gas=None):
+        return await self.transactions.transact_many(functions, gas)
+
+    # Reads
+
+    async def students(self, student_ids):
+        """(sum of credits, sum of marks, has value, semester of the last mark) of the students in one batch."""
+        return await asyncio.gather(*(self.call(self.student.functions.students(student_id))
+                                      for student_id in student_ids))
+
+    async def seats(self, semester_id, student_id):
+        """(token id, course id, mark) of the seat tokens of a student in a semester, unclaimed places included."""
+        semester = await self.semester(semester_id)
+        token_ids = await self.call(semester.functions.tokensOf(student_id))
+        values = await asyncio.gather(*(self.call(function) for token_id in token_ids for function in (
+            semester.functions.courseIds(token_id),
+            semester.functions.marks(token_id),
+        )))
+        return [(token_id, *values[2 * i:2 * i + 2]) for i, token_id in enumerate(token_ids)]
+
+    # Bulk operations of the owner and the teachers
+
+    async def create_students(self, addresses, gas=None):
+        """Onboards the students one transaction each, without waiting for the receipts in turn."""
+        return await self.transact_many([self.university.functions.createStudent(address)
+                                         for address in addresses], gas)
+
+    async def mark_students(self, marks, gas=None):
+        """Marks tokens of the current semester, `marks` maps token ids to marks."""
+        return await self.transact_many([self.university.functions.markStudent(token_id, mark)
+                                         for token_id, mark in marks.items()], gas)
+
+    async def _resolve_semester(self, semester_id):
+        address = await self.call(self.university.functions.semesters(semester_id))
+        return self._contract("Semester", address)
+
+    def _contract(self, name, address):
+        return self.w3.eth.contract(address=address, abi=self.abis[name])
@@ -6,12 +6,13 @@ import "./Token/ERC1238/ERC1238.sol";
 import "./Person.sol";
 import "./University.sol";
 
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts/utils/Counters.sol";
 
 /**
  * @dev Implementation of the available courses which can be used during a semester.
  */
- contract CourseCatalog is ERC1238 {
+ contract CourseCatalog is Initializable, ERC1238 {
     using Counters for Counters.Counter;
     using Common for Common.State;
 
@@ -22,13 +23,36 @@ import "@openzeppelin/contracts/utils/Counters.sol";
     Counters.Counter private _tokenId;
     // main university smart contract
     University private _university;
+    // teacher contract of the university, it never changes so it is not queried from the university
+    Person private _teacher;
 
-    constructor(string memory name_, string memory symbol_, address universityAddr_) ERC1238(name_, symbol_) {
+    constructor(
+        string memory name_,
+        string memory symbol_,
+        address universityAddr_,
+        address teacherAddr_) ERC1238(name_, symbol_) initializer {
         _university = University(universityAddr_);
+        _teacher = Person(teacherAddr_);
+    }
+
+    // Initializes a minimal proxy clone of this contract
+    function initialize(
+        string memory name_,
+        string memory symbol_,
+        address universityAddr_,
+        address teacherAddr_) initializer public {
+        super._setNameAndSymbol(name_, symbol_);
+        _university = University(universityAddr_);
+        _teacher = Person(teacherAddr_);
+    }
+
+    // Returns the owner and the credit value of a course in one call
+    function courseOf(uint256 tokenId_) public view returns (address, uint8) {
+        return (ERC1238.ownerOf(tokenId_), creditValues[tokenId_]);
     }
 
     function mint(uint8 creditValue_) offSeason public {
-        require(_university.teacher().balanceOf(_msgSender()) == 1, "Only teacher can mint a course!");
+        require(_teacher.balanceOf(_msgSender()) == 1, "Only teacher can mint a course!");
         _tokenId.increment();
         super._mint(_msgSender(), _tokenId.current());
         creditValues[_tokenId.current()] = creditValue_;
@@ -45,6 +69,15 @@ import "@openzeppelin/contracts/utils/Counters.sol";
         super._setTokenURI(tokenId_, tokenURI_);
     }
 
+    function setTokenContentHash(uint256 tokenId_, bytes32 contentHash_) modifiableState public {
+        super._setTokenContentHash(tokenId_, contentHash_);
+    }
+
+    function setBaseURI(string memory baseURI_) public {
+        require(_msgSender() == address(_university), "Only the university can set the base URI!");
+        super._setBaseURI(baseURI_);
+    }
+
     modifier modifiableState() {
         require(_university.currentState() == Common.EState.offSeason ||
             _university.currentState() == Common.EState.planning,
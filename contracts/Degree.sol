@@ -6,27 +6,49 @@ import "../interfaces/IDegree.sol";
 import "./Token/ERC1238/ERC1238.sol";
 
 import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts/utils/Counters.sol";
 
-contract Degree is Ownable, ERC1238, IDegree {
+contract Degree is Ownable, Initializable, ERC1238, IDegree {
     using Counters for Counters.Counter;
 
-    // mapping degree with credit value
-    mapping(uint256 => uint32) public creditValues;
+    // credit and hash values of a degree, packed into one storage slot
+    struct DegreeInfo {
+        uint32 creditValue;
+        uint32 hashValue;
+    }
 
-    // mapping degree with hash value
-    mapping(uint256 => uint32) public hashValues;
+    // mapping degree with credit and hash value
+    mapping(uint256 => DegreeInfo) private _degrees;
 
     // last degree unique id
     Counters.Counter private _tokenId;
 
-    constructor(string memory name_, string memory symbol_) ERC1238(name_, symbol_) {}
+    constructor(string memory name_, string memory symbol_) ERC1238(name_, symbol_) initializer {}
+
+    // Initializes a minimal proxy clone of this contract, the caller becomes the owner
+    function initialize(string memory name_, string memory symbol_) initializer public {
+        super._setNameAndSymbol(name_, symbol_);
+        _transferOwnership(_msgSender());
+    }
+
+    // mapping degree with credit value
+    function creditValues(uint256 tokenId_) public view returns (uint32) {
+        return _degrees[tokenId_].creditValue;
+    }
+
+    // mapping degree with hash value
+    function hashValues(uint256 tokenId_) public view returns (uint32) {
+        return _degrees[tokenId_].hashValue;
+    }
 
     function mint(address to_, uint32 sumMarks_, uint32 sumCredits_) onlyOwner public {
         _tokenId.increment();
-        super._mint(to_, _tokenId.current());
-        creditValues[_tokenId.current()] = (sumMarks_ + sumCredits_) * 1000 / 30;
-        emit CreditValue(_tokenId.current(), creditValues[_tokenId.current()]);
+        uint256 tokenId = _tokenId.current();
+        uint32 creditValue = (sumMarks_ + sumCredits_) * 1000 / 30;
+        super._mint(to_, tokenId);
+        _degrees[tokenId].creditValue = creditValue;
+        emit CreditValue(tokenId, creditValue);
     }
 
     // Burning functionality is removed
@@ -38,8 +60,16 @@ contract Degree is Ownable, ERC1238, IDegree {
         super._setTokenURI(tokenId_, tokenURI_);
     }
 
+    function setTokenContentHash(uint256 tokenId_, bytes32 contentHash_) virtual public {
+        super._setTokenContentHash(tokenId_, contentHash_);
+    }
+
+    function setBaseURI(string memory baseURI_) onlyOwner virtual public {
+        super._setBaseURI(baseURI_);
+    }
+
     function setHash(uint256 tokenId_, uint32 hash_) onlyOwner public {
-        hashValues[tokenId_] = hash_;
+        _degrees[tokenId_].hashValue = hash_;
         emit HashValue(tokenId_, hash_);
     }
 }
\ No newline at end of file
@@ -1,6 +1,7 @@
 // SPDX-License-Identifier: MIT
 pragma solidity ^0.8.0;
 
+import "./MinHeap.sol";
 import "./OrderedList.sol";
 
 import "@openzeppelin/contracts/utils/Counters.sol";
@@ -10,77 +11,283 @@ import "@openzeppelin/contracts/utils/Counters.sol";
  *
  * It consists of a binary tree that is ordered by students' index.
  * The limit is the maximum number of students in a given course.
+ *
+ * Every key packs the index into the upper and the student id into the lower 128 bits, so equal
+ * indexes never collide, they are ordered by student id, and the student is decoded from the key.
+ *
+ * With the heap engine the students are kept in a bounded min-heap of the same keys instead of the tree,
+ * so the student with the lowest index is always the first item.
+ *
+ * With the off-chain engine the applications are only recorded, nobody is removed while applying.
+ * The owner computes the roster off-chain and submits it with {allocate}, which verifies it in a single
+ * linear pass. The students are ranked by the same packed items as in the heap, so the roster is fully
+ * described by its lowest item, the cutoff.
  */
 library CourseHelper {
+    using MinHeap for MinHeap.Heap;
     using OrderedList for OrderedList.Tree;
     using Counters for Counters.Counter;
 
+    enum Engine {
+        tree,
+        heap,
+        offChain
+    }
+
     struct Course {
         bool created;
         uint16 limit;
+        Engine engine;
+        // the roster of an off-chain course is verified
+        bool allocated;
+        // number of students in the verified off-chain roster, at most the limit
+        uint16 allocatedStudents;
+        // packed index and student id keys
         OrderedList.Tree tree;
-        // credit index - student id
-        mapping(uint => uint256) values;
-        // student id - is claimed
-        mapping(uint256 => bool) claims;
+        // student id - token id of the claimed seat, zero while the seat is unclaimed
+        mapping(uint256 => uint256) tokens;
         // student id - credit index
         mapping(uint256 => uint) keys;
         Counters.Counter numberOfStudents;
+        // packed index and student id items
+        MinHeap.Heap heap;
+        // packed index and student id items of every application to an off-chain course
+        uint256[] applications;
+        // the lowest packed item of the verified off-chain roster
+        uint256 cutoff;
     }
 
     function applyForCourse(Course storage self, uint256 student, uint index) public returns (bool, uint256) {
         require(self.keys[student] == 0, "Student has already applied for this course!");
         require(index > 1, "Student has too low index!");
 
-        if (self.limit <= self.numberOfStudents.current()) {
-            uint firstIndex = self.tree.first();
-            require(firstIndex < index, "The first index is too high to apply for this course!");
-            uint256 removedStudentId = self.values[firstIndex];
-            _remove(self, firstIndex);
-            if (self.tree.exists(index)) {
-                _insert(self, index - 1, student); // FIXME better handling is necessary
-            } else {
-                _insert(self, index, student);
-            }
-            return (true, removedStudentId);
+        if (self.engine == Engine.heap) {
+            return _applyToHeap(self, student, index);
+        }
+        if (self.engine == Engine.offChain) {
+            self.keys[student] = index;
+            self.applications.push(_pack(index, student));
+            return (false, 0);
         }
 
-        if (self.tree.exists(index)) {
-            _insert(self, index - 1, student); // FIXME better handling is necessary
-        } else {
+        if (self.limit <= self.numberOfStudents.current()) {
+            uint firstKey = self.tree.first();
+            require(firstKey >> 128 < index, "The first index is too high to apply for this course!");
+            uint256 removedStudentId = uint128(firstKey);
+            _remove(self, firstKey);
             _insert(self, index, student);
+            return (true, removedStudentId);
         }
+
+        _insert(self, index, student);
         return (false, 0);
     }
 
+    // Verifies the roster of an off-chain course, the students ordered by their index, lowest first
+    function allocate(Course storage self, uint256[] memory students, uint[] memory indexes) public {
+        require(self.engine == Engine.offChain, "The course is not allocated off-chain!");
+        require(self.allocated == false, "The course is already allocated!");
+        require(students.length == indexes.length, "The number of students and indexes differ!");
+        uint256 numberOfApplications = self.applications.length;
+        uint256 numberOfPlaces = numberOfApplications < self.limit ? numberOfApplications : self.limit;
+        require(students.length == numberOfPlaces, "The roster does not fill the course!");
+
+        // strictly increasing items of real applications, so every student is in the roster once
+        uint256 previous = 0;
+        for (uint256 i = 0; i < students.length; i++) {
+            require(
+                indexes[i] != 0 && self.keys[students[i]] == indexes[i],
+                "The index does not match the application!"
+            );
+            uint256 item = _pack(indexes[i], students[i]);
+            require(item > previous, "The roster is not sorted!");
+            previous = item;
+        }
+        uint256 cutoff = students.length == 0 ? type(uint256).max : _pack(indexes[0], students[0]);
+
+        // the roster is the top of the applications if no other application reaches its cutoff
+        if (numberOfPlaces < numberOfApplications) {
+            uint256 numberOfHigher = 0;
+            for (uint256 i = 0; i < numberOfApplications; i++) {
+                if (self.applications[i] >= cutoff) {
+                    numberOfHigher++;
+                }
+            }
+            require(numberOfHigher == numberOfPlaces, "A student with a higher index is left out!");
+        }
+
+        self.allocated = true;
+        self.cutoff = cutoff;
+        self.allocatedStudents = uint16(numberOfPlaces);
+    }
+
     function leaveFromCourse(Course storage self, uint256 student) public {
         require(self.keys[student] != 0);
-        _remove(self, self.keys[student]);
+        require(self.engine != Engine.offChain, "The course is allocated off-chain!");
+        if (self.engine == Engine.heap) {
+            self.heap.remove(_pack(self.keys[student], student));
+            delete self.keys[student];
+            return;
+        }
+        _remove(self, _pack(self.keys[student], student));
     }
 
+    // Returns the key of the student with the lowest index, the walk of {next} starts from it
     function first(Course storage self) public view returns (uint) {
+        if (self.engine == Engine.heap) {
+            return self.heap.size() == 0 ? 0 : self.heap.top();
+        }
+        if (self.engine == Engine.offChain) {
+            return self.allocatedStudents != 0 ? self.cutoff : 0;
+        }
         return self.tree.first();
     }
 
+    // Returns the key of the student with the highest index
     function last(Course storage self) public view returns (uint) {
+        require(self.engine == Engine.tree, "The course is not ordered by a tree!");
         return self.tree.last();
     }
 
+    // Returns the key following `key`, the keys pack the index and the student id
     function next(Course storage self, uint key) public view returns (uint) {
+        require(self.engine == Engine.tree, "The course is not ordered by a tree!");
         return self.tree.next(key);
     }
 
-    function _insert(Course storage self, uint _key, uint256 _student) private {
-        self.tree.insert(_key);
-        self.values[_key] = _student;
-        self.keys[_student] = _key;
+    // Returns at most `count` students from the `offset` position ordered by their index, lowest first
+    function roster(
+        Course storage self,
+        uint256 offset,
+        uint256 count
+    ) public view returns (uint[] memory indexes, uint256[] memory students, bool[] memory claimed) {
+        uint256 length = size(self);
+        length = offset < length ? length - offset : 0;
+        if (count < length) {
+            length = count;
+        }
+        indexes = new uint[](length);
+        students = new uint256[](length);
+        claimed = new bool[](length);
+        if (length == 0) {
+            return (indexes, students, claimed);
+        }
+
+        if (self.engine == Engine.heap) {
+            _heapRoster(self, offset, indexes, students);
+        } else if (self.engine == Engine.offChain) {
+            _offChainRoster(self, offset, indexes, students);
+        } else {
+            _treeRoster(self, offset, indexes, students);
+        }
+        for (uint256 i = 0; i < length; i++) {
+            claimed[i] = self.tokens[students[i]] != 0;
+        }
+    }
+
+    // number of students who currently have a place in the course
+    function size(Course storage self) internal view returns (uint256) {
+        if (self.engine == Engine.heap) {
+            return self.heap.size();
+        }
+        if (self.engine == Engine.offChain) {
+            return self.allocatedStudents;
+        }
+        return self.numberOfStudents.current();
+    }
+
+    // whether the student has a place in the course, off-chain courses have no places until they are allocated
+    function hasPlace(Course storage self, uint256 student) internal view returns (bool) {
+        if (self.keys[student] == 0) {
+            return false;
+        }
+        if (self.engine == Engine.offChain) {
+            return self.allocated && _pack(self.keys[student], student) >= self.cutoff;
+        }
+        return true;
+    }
+
+    function _applyToHeap(Course storage self, uint256 student, uint index) private returns (bool, uint256) {
+        uint256 item = _pack(index, student);
+        self.keys[student] = index;
+
+        if (self.limit <= self.heap.size()) {
+            require(self.heap.top() >> 128 < index, "The first index is too high to apply for this course!");
+            uint256 removedStudentId = uint128(self.heap.replaceTop(item));
+            delete self.keys[removedStudentId];
+            return (true, removedStudentId);
+        }
+
+        self.heap.push(item);
+        return (false, 0);
+    }
+
+    function _treeRoster(
+        Course storage self,
+        uint256 offset,
+        uint[] memory indexes,
+        uint256[] memory students
+    ) private view {
+        uint key = self.tree.first();
+        for (uint256 i = 0; i < offset; i++) {
+            key = self.tree.next(key);
+        }
+        for (uint256 i = 0; i < indexes.length; i++) {
+            if (i > 0) {
+                key = self.tree.next(key);
+            }
+            indexes[i] = key >> 128;
+            students[i] = uint128(key);
+        }
+    }
+
+    function _heapRoster(
+        Course storage self,
+        uint256 offset,
+        uint[] memory indexes,
+        uint256[] memory students
+    ) private view {
+        uint256[] memory items = self.heap.smallest(offset + indexes.length);
+        for (uint256 i = 0; i < indexes.length; i++) {
+            indexes[i] = items[offset + i] >> 128;
+            students[i] = uint128(items[offset + i]);
+        }
+    }
+
+    function _offChainRoster(
+        Course storage self,
+        uint256 offset,
+        uint[] memory indexes,
+        uint256[] memory students
+    ) private view {
+        uint256[] memory items = new uint256[](self.allocatedStudents);
+        uint256 numberOfItems = 0;
+        for (uint256 i = 0; i < self.applications.length; i++) {
+            if (self.applications[i] >= self.cutoff) {
+                items[numberOfItems++] = self.applications[i];
+            }
+        }
+        items = MinHeap.sort(items);
+        for (uint256 i = 0; i < indexes.length; i++) {
+            indexes[i] = items[offset + i] >> 128;
+            students[i] = uint128(items[offset + i]);
+        }
+    }
+
+    function _pack(uint _index, uint256 _student) private pure returns (uint256) {
+        require(_index <= type(uint128).max && _student <= type(uint128).max, "Too high value for a key!");
+        return _index << 128 | _student;
+    }
+
+    function _insert(Course storage self, uint _index, uint256 _student) private {
+        self.tree.insert(_pack(_index, _student));
+        self.keys[_student] = _index;
         self.numberOfStudents.increment();
     }
 
     function _remove(Course storage self, uint _key) private {
         self.tree.remove(_key);
-        delete self.keys[self.values[_key]];
-        delete self.values[_key];
+        delete self.keys[uint128(_key)];
         self.numberOfStudents.decrement();
     }
 }
\ No newline at end of file
@@ -0,0 +1,138 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+/**
+ * @dev Implementation of an array-backed binary min-heap of uint256 items.
+ *
+ * The minimum is always the first item, so reading it is O(1) and every update is O(log n).
+ * Sifting moves a hole instead of swapping, so each touched position is written only once.
+ */
+library MinHeap {
+    struct Heap {
+        uint256[] items;
+    }
+
+    function size(Heap storage self) internal view returns (uint256) {
+        return self.items.length;
+    }
+
+    function top(Heap storage self) internal view returns (uint256) {
+        require(self.items.length != 0, "The heap is empty!");
+        return self.items[0];
+    }
+
+    function push(Heap storage self, uint256 item) internal {
+        self.items.push(item);
+        siftUp(self, self.items.length - 1, item);
+    }
+
+    // replaces the minimum with `item` and returns the removed minimum
+    function replaceTop(Heap storage self, uint256 item) internal returns (uint256 removed) {
+        removed = top(self);
+        siftDown(self, 0, item);
+    }
+
+    function remove(Heap storage self, uint256 item) internal {
+        uint256 length = self.items.length;
+        uint256 position = 0;
+        while (position < length && self.items[position] != item) {
+            position++;
+        }
+        require(position < length, "The item is not in the heap!");
+        uint256 lastItem = self.items[length - 1];
+        self.items.pop();
+        if (position == length - 1) {
+            return;
+        }
+        if (position > 0 && lastItem < self.items[(position - 1) / 2]) {
+            siftUp(self, position, lastItem);
+        } else {
+            siftDown(self, position, lastItem);
+        }
+    }
+
+    // returns the `count` smallest items in ascending order, the heap is sorted in memory
+    function smallest(Heap storage self, uint256 count) internal view returns (uint256[] memory result) {
+        uint256 length = self.items.length;
+        uint256[] memory items = new uint256[](length);
+        for (uint256 i = 0; i < length; i++) {
+            items[i] = self.items[i];
+        }
+        if (count > length) {
+            count = length;
+        }
+        result = new uint256[](count);
+        for (uint256 i = 0; i < count; i++) {
+            result[i] = items[0];
+            length--;
+            siftDownMemory(items, 0, length, items[length]);
+        }
+    }
+
+    // returns the memory items in ascending order, `items` is reordered
+    function sort(uint256[] memory items) internal pure returns (uint256[] memory result) {
+        uint256 length = items.length;
+        for (uint256 position = length / 2; position > 0; position--) {
+            siftDownMemory(items, position - 1, length, items[position - 1]);
+        }
+        result = new uint256[](length);
+        for (uint256 i = 0; i < result.length; i++) {
+            result[i] = items[0];
+            length--;
+            siftDownMemory(items, 0, length, items[length]);
+        }
+    }
+
+    function siftUp(Heap storage self, uint256 position, uint256 item) private {
+        while (position > 0) {
+            uint256 parent = (position - 1) / 2;
+            uint256 parentItem = self.items[parent];
+            if (parentItem <= item) {
+                break;
+            }
+            self.items[position] = parentItem;
+            position = parent;
+        }
+        self.items[position] = item;
+    }
+
+    function siftDown(Heap storage self, uint256 position, uint256 item) private {
+        uint256 length = self.items.length;
+        while (true) {
+            uint256 child = 2 * position + 1;
+            if (child >= length) {
+                break;
+            }
+            uint256 childItem = self.items[child];
+            if (child + 1 < length && self.items[child + 1] < childItem) {
+                child++;
+                childItem = self.items[child];
+            }
+            if (item <= childItem) {
+                break;
+            }
+            self.items[position] = childItem;
+            position = child;
+        }
+        self.items[position] = item;
+    }
+
+    // moves `item` from `position` of the first `length` memory items to its place
+    function siftDownMemory(uint256[] memory items, uint256 position, uint256 length, uint256 item) private pure {
+        while (true) {
+            uint256 child = 2 * position + 1;
+            if (child >= length) {
+                break;
+            }
+            if (child + 1 < length && items[child + 1] < items[child]) {
+                child++;
+            }
+            if (item <= items[child]) {
+                break;
+            }
+            items[position] = items[child];
+            position = child;
+        }
+        items[position] = item;
+    }
+}
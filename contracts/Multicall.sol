@@ -0,0 +1,29 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+/**
+ * @dev Aggregates view calls of any contracts into a single call.
+ *
+ * It holds no state, the asynchronous client batches its reads through one deployment.
+ */
+contract Multicall {
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    // Calls the targets in order and returns their results, a failing call does not revert the others
+    function tryAggregate(Call[] calldata calls_) public view returns (uint256 blockNumber, Result[] memory results) {
+        blockNumber = block.number;
+        results = new Result[](calls_.length);
+        for (uint256 i = 0; i < calls_.length; i++) {
+            (bool success, bytes memory returnData) = calls_[i].target.staticcall(calls_[i].callData);
+            results[i] = Result(success, returnData);
+        }
+    }
+}
\ No newline at end of file
@@ -5,28 +5,39 @@ import "../interfaces/IPerson.sol";
 import "./Token/ERC1238/ERC1238.sol";
 
 import "@openzeppelin/contracts/access/Ownable.sol";
-import "@openzeppelin/contracts/utils/Counters.sol";
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 
-contract Person is Ownable, IPerson, ERC1238 {
-    using Counters for Counters.Counter;
-
-    // last person unique id
-    Counters.Counter public _tokenId;
+contract Person is Ownable, Initializable, IPerson, ERC1238 {
+    // last person unique id, a plain counter so a batch writes it once
+    uint256 public _tokenId;
     // Mapping owner address to token
     mapping(address => uint256) private _tokens;
 
-    constructor(string memory name_, string memory symbol_) ERC1238(name_, symbol_) {}
+    constructor(string memory name_, string memory symbol_) ERC1238(name_, symbol_) initializer {}
+
+    // Initializes a minimal proxy clone of this contract, the caller becomes the owner
+    function initialize(string memory name_, string memory symbol_) initializer public {
+        super._setNameAndSymbol(name_, symbol_);
+        _transferOwnership(_msgSender());
+    }
 
     function tokenOf(address owner_) public view virtual override returns (uint256) {
         return _tokens[owner_];
     }
 
     function mint(address to_) onlyOwner virtual public {
-        _tokenId.increment();
-        // One address can own only one token
-        require(balanceOf(to_) == 0, "The address already owns a token!");
-        super._mint(to_, _tokenId.current());
-        _tokens[to_] = _tokenId.current();
+        _tokenId++;
+        _mintPerson(to_, _tokenId);
+    }
+
+    // Mints a token for every address with consecutive ids, the counter is written only once
+    function mintBatch(address[] calldata to_) onlyOwner virtual public {
+        uint256 tokenId = _tokenId;
+        for (uint256 i = 0; i < to_.length; i++) {
+            tokenId++;
+            _mintPerson(to_[i], tokenId);
+        }
+        _tokenId = tokenId;
     }
 
     function burn(uint256 tokenId_) onlyOwner virtual public {
@@ -38,4 +49,19 @@ contract Person is Ownable, IPerson, ERC1238 {
     function setTokenURI(uint256 tokenId_, string memory tokenURI_) virtual public {
         super._setTokenURI(tokenId_, tokenURI_);
     }
+
+    function setTokenContentHash(uint256 tokenId_, bytes32 contentHash_) virtual public {
+        super._setTokenContentHash(tokenId_, contentHash_);
+    }
+
+    function setBaseURI(string memory baseURI_) onlyOwner virtual public {
+        super._setBaseURI(baseURI_);
+    }
+
+    function _mintPerson(address to_, uint256 tokenId_) internal virtual {
+        // One address can own only one token
+        require(balanceOf(to_) == 0, "The address already owns a token!");
+        super._mint(to_, tokenId_);
+        _tokens[to_] = tokenId_;
+    }
 }
\ No newline at end of file
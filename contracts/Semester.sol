@@ -8,47 +8,187 @@ import "./Library/CourseHelper.sol";
 import "./University.sol";
 
 import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
 import "@openzeppelin/contracts/utils/Counters.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 
-contract Semester is Ownable, ISemester, ERC721 {
+contract Semester is Ownable, Initializable, ISemester, ERC721 {
     using Counters for Counters.Counter;
     using CourseHelper for CourseHelper.Course;
     using Common for Common.State;
 
+    // information of a claimed course place, packed into one storage slot
+    struct Seat {
+        uint8 mark;
+        uint64 courseId;
+        uint128 studentId;
+    }
+
     // current state of the semester
     Common.State public currentState;
     // given unique id for semester
     uint256 public semesterId;
-    // tokenid - mark
-    mapping(uint256 => uint8) public marks;
-    // tokenid - student id
-    mapping(uint256 => uint256) public studentIds;
-    // tokenid - course id
-    mapping(uint256 => uint256) public courseIds;
 
     // main university smart contract
     University private _university;
+    // teacher and student contracts of the university, they never change so they are not queried every time
+    Person private _teacher;
+    Student private _student;
     // last course space unique id
     Counters.Counter private _tokenId;
     // course id - course helper
     mapping(uint256 => CourseHelper.Course) private _courses;
+    // tokenid - seat
+    mapping(uint256 => Seat) private _seats;
+    // token name and symbol, the ones of ERC721 are private and cannot be set in a clone
+    string private _semesterName;
+    string private _semesterSymbol;
+    // ids of the added courses
+    uint256[] private _courseIds;
+    // student id - ids of the seat tokens the owner transferred to the student, see {tokensOf}
+    mapping(uint256 => uint256[]) private _receivedTokens;
 
     constructor(
         string memory name_,
         string memory symbol_,
         address uniAddr_,
-        uint256 semesterId_) ERC721(name_, symbol_) {
-        _university = University(uniAddr_);
-        currentState.state = Common.EState.planning;
-        semesterId = semesterId_;
+        uint256 semesterId_) ERC721("", "") initializer {
+        _initialize(name_, symbol_, uniAddr_, semesterId_);
+    }
+
+    // Initializes a minimal proxy clone of this contract, the caller becomes the owner
+    function initialize(
+        string memory name_,
+        string memory symbol_,
+        address uniAddr_,
+        uint256 semesterId_) initializer public {
+        _initialize(name_, symbol_, uniAddr_, semesterId_);
+        _transferOwnership(_msgSender());
+    }
+
+    // tokenid - mark
+    function marks(uint256 tokenId_) public view returns (uint8) {
+        return _seats[tokenId_].mark;
+    }
+
+    // tokenid - student id
+    function studentIds(uint256 tokenId_) public view returns (uint256) {
+        if (_seatOwner(tokenId_) != address(0)) {
+            return uint128(tokenId_);
+        }
+        return _seats[tokenId_].studentId;
+    }
+
+    // tokenid - course id
+    function courseIds(uint256 tokenId_) public view returns (uint256) {
+        if (_seatOwner(tokenId_) != address(0)) {
+            return tokenId_ >> 128;
+        }
+        return _seats[tokenId_].courseId;
+    }
+
+    // Returns the id of the seat token a student owns without claiming it, once the semester is in trading
+    function seatTokenId(uint256 courseId_, uint256 studentId_) public pure returns (uint256) {
+        return uint256(SafeCast.toUint64(courseId_)) << 128 | SafeCast.toUint128(studentId_);
+    }
+
+    // Unclaimed seats are owned by the owner of their student token, see {seatTokenId}
+    function ownerOf(uint256 tokenId_) public view virtual override returns (address) {
+        if (_exists(tokenId_)) {
+            return super.ownerOf(tokenId_);
+        }
+        address seatOwner = _seatOwner(tokenId_);
+        require(seatOwner != address(0), "ERC721: owner query for nonexistent token");
+        return seatOwner;
+    }
+
+    function balanceOf(address owner_) public view virtual override returns (uint256 balance) {
+        balance = super.balanceOf(owner_);
+        if (!_seatsDerived()) {
+            return balance;
+        }
+        uint256 studentId = _student.tokenOf(owner_);
+        if (studentId == 0) {
+            return balance;
+        }
+        for (uint256 i = 0; i < _courseIds.length; i++) {
+            CourseHelper.Course storage course = _courses[_courseIds[i]];
+            if (course.tokens[studentId] == 0 && course.hasPlace(studentId)) {
+                balance++;
+            }
+        }
+    }
+
+    // Returns the students of a course ordered by their index, lowest first, with their claim flags
+    function roster(
+        uint256 courseId_,
+        uint256 offset_,
+        uint256 count_
+    ) public view returns (uint256[] memory, uint256[] memory, bool[] memory) {
+        require(_courses[courseId_].created, "There is no course with this id!");
+        return _courses[courseId_].roster(offset_, count_);
+    }
+
+    // Returns the seat tokens of a student, the own ones in course order, then the received ones
+    function tokensOf(uint256 studentId_) public view returns (uint256[] memory tokenIds) {
+        uint256[] storage received = _receivedTokens[studentId_];
+        uint256[] memory matches = new uint256[](_courseIds.length + received.length);
+        uint256 numberOfMatches = 0;
+        for (uint256 i = 0; i < _courseIds.length; i++) {
+            uint256 tokenId = _courses[_courseIds[i]].tokens[studentId_];
+            if (tokenId != 0) {
+                if (_seats[tokenId].studentId == studentId_) {
+                    matches[numberOfMatches++] = tokenId;
+                }
+            } else {
+                tokenId = seatTokenId(_courseIds[i], studentId_);
+                if (_seatOwner(tokenId) != address(0)) {
+                    matches[numberOfMatches++] = tokenId;
+                }
+            }
+        }
+        for (uint256 i = 0; i < received.length; i++) {
+            uint256 tokenId = received[i];
+            Seat storage seat = _seats[tokenId];
+            // an own token given back to the student is already listed
+            if (seat.studentId != studentId_ || _courses[seat.courseId].tokens[studentId_] == tokenId) {
+                continue;
+            }
+            if (!_listedBefore(received, i)) {
+                matches[numberOfMatches++] = tokenId;
+            }
+        }
+
+        tokenIds = new uint256[](numberOfMatches);
+        for (uint256 i = 0; i < numberOfMatches; i++) {
+            tokenIds[i] = matches[i];
+        }
+    }
+
+    // id of the last claimed token, the token ids are consecutive from 1
+    function lastTokenId() public view returns (uint256) {
+        return _tokenId.current();
+    }
+
+    function name() public view virtual override returns (string memory) {
+        return _semesterName;
+    }
+
+    function symbol() public view virtual override returns (string memory) {
+        return _semesterSymbol;
     }
 
     function addNewCourse(uint256 courseId_, uint16 numberOfStudents_) onlyOwner inPlanning public {
-        require(_courses[courseId_].created == false, "This course is already added!");
-        _courses[courseId_].created = true;
-        _courses[courseId_].limit = numberOfStudents_;
-        emit AddNewCourse(courseId_, numberOfStudents_);
+        _addNewCourse(courseId_, numberOfStudents_, CourseHelper.Engine.tree);
+    }
+
+    function addNewCourse(
+        uint256 courseId_,
+        uint16 numberOfStudents_,
+        CourseHelper.Engine engine_
+    ) onlyOwner inPlanning public {
+        _addNewCourse(courseId_, numberOfStudents_, engine_);
     }
 
     function setNextState() onlyOwner public {
@@ -57,35 +197,86 @@ contract Semester is Ownable, ISemester, ERC721 {
         emit SetNextState(uint8(currentState.current()));
     }
 
-    function markStudent(uint256 tokenId_, uint8 mark_) onlyOwner inActice public {
+    // Returns the course id and the student id of the marked token
+    function markStudent(uint256 tokenId_, uint8 mark_) onlyOwner inActice public returns (uint256, uint256) {
+        _materialize(tokenId_);
         require(super.ownerOf(tokenId_) != address(0), "This token is not exist!");
-        marks[tokenId_] = mark_;
+        Seat storage seat = _seats[tokenId_];
+        seat.mark = mark_;
         emit StudentMarked(tokenId_, mark_);
+        return (seat.courseId, seat.studentId);
+    }
+
+    // Marks tokens of the `courseId_` course and returns their student ids in the same order
+    function markStudents(
+        uint256 courseId_,
+        uint256[] calldata tokenIds_,
+        uint8[] calldata marks_
+    ) onlyOwner inActice public returns (uint256[] memory studentIds_) {
+        require(tokenIds_.length == marks_.length, "The number of tokens and marks differ!");
+        studentIds_ = new uint256[](tokenIds_.length);
+        for (uint256 i = 0; i < tokenIds_.length; i++) {
+            _materialize(tokenIds_[i]);
+            require(_exists(tokenIds_[i]), "This token is not exist!");
+            Seat storage seat = _seats[tokenIds_[i]];
+            require(seat.courseId == courseId_, "The token is not a place of this course!");
+            seat.mark = marks_[i];
+            studentIds_[i] = seat.studentId;
+            emit StudentMarked(tokenIds_[i], marks_[i]);
+        }
     }
 
     function applyForCourse(uint256 courseId_, uint256 studentId_, uint256 index_) onlyOwner inApplying public {
-        require(_courses[courseId_].created == true, "There is no course with given id!");
-        (bool isRemoved, uint256 removedStudentId) = _courses[courseId_].applyForCourse(studentId_,
-            (index_ + 1) * 1000 / 30  + _courses[courseId_].limit - _courses[courseId_].numberOfStudents.current());
-        emit ApplyForCourse(courseId_, studentId_,  _courses[courseId_].keys[studentId_]);
-        if (isRemoved) {
-            emit RemoveForCourse(courseId_, removedStudentId);
+        _applyForCourse(courseId_, studentId_, index_);
+    }
+
+    function applyForCourses(
+        uint256[] calldata courseIds_,
+        uint256 studentId_,
+        uint256 index_
+    ) onlyOwner inApplying public {
+        for (uint256 i = 0; i < courseIds_.length; i++) {
+            _applyForCourse(courseIds_[i], studentId_, index_);
         }
     }
 
-    function claim(uint256 courseId_, uint256 studentId_) onlyStudent inTrading public {
-        require(_university.student().ownerOf(studentId_) == _msgSender(),
-            "You are not the owner of this student token!");
+    // Submits the roster of an off-chain course computed from the applications, see {CourseHelper-allocate}
+    function allocate(
+        uint256 courseId_,
+        uint256[] calldata studentIds_,
+        uint256[] calldata indexes_
+    ) onlyOwner inTrading public {
+        require(_courses[courseId_].created, "There is no course with this id!");
+        _courses[courseId_].allocate(studentIds_, indexes_);
+        uint256 cutoff = _courses[courseId_].cutoff;
+        emit AllocateCourse(courseId_, studentIds_.length, cutoff >> 128, uint128(cutoff));
+    }
+
+    function claim(uint256 courseId_, uint256 studentId_) inTrading public {
+        // an address owns at most one student token, so its id answers both checks
+        uint256 senderStudentId = _student.tokenOf(_msgSender());
+        require(senderStudentId != 0, "You must be a student!");
+        require(senderStudentId == studentId_, "You are not the owner of this student token!");
         require(_courses[courseId_].created, "There is no course with this id!");
-        require(_courses[courseId_].claims[studentId_] == false, "You have already claimed this course!");
-        require(_courses[courseId_].keys[studentId_] != 0, "You have no place in this course!");
+        require(_courses[courseId_].tokens[studentId_] == 0, "You have already claimed this course!");
+        require(_courses[courseId_].hasPlace(studentId_), "You have no place in this course!");
 
         _tokenId.increment();
-        super._mint(_msgSender(), _tokenId.current());
-        studentIds[_tokenId.current()] = studentId_;
-        courseIds[_tokenId.current()] = courseId_;
-        _courses[courseId_].claims[studentId_] = true;
-        emit ClaimCourse(courseId_, studentId_, _tokenId.current());
+        uint256 tokenId = _tokenId.current();
+        super._mint(_msgSender(), tokenId);
+        _seats[tokenId] = Seat({
+            mark: 0,
+            courseId: SafeCast.toUint64(courseId_),
+            studentId: SafeCast.toUint128(studentId_)
+        });
+        _courses[courseId_].tokens[studentId_] = tokenId;
+        emit ClaimCourse(courseId_, studentId_, tokenId);
+    }
+
+    // An unclaimed seat is minted first, so its owner can approve a transfer
+    function approve(address to_, uint256 tokenId_) public virtual override {
+        _materialize(tokenId_);
+        super.approve(to_, tokenId_);
     }
 
     function transferFrom(
@@ -93,6 +284,7 @@ contract Semester is Ownable, ISemester, ERC721 {
         address to_,
         uint256 tokenId_
     ) onlyOwner inTrading public virtual override {
+        _materialize(tokenId_);
         super.transferFrom(from_, to_, tokenId_);
         updateStudentId(from_, to_, tokenId_);
     }
@@ -102,6 +294,7 @@ contract Semester is Ownable, ISemester, ERC721 {
         address to_,
         uint256 tokenId_
     ) onlyOwner inTrading public virtual override {
+        _materialize(tokenId_);
         super.safeTransferFrom(from_, to_, tokenId_);
         updateStudentId(from_, to_, tokenId_);
     }
@@ -112,18 +305,106 @@ contract Semester is Ownable, ISemester, ERC721 {
         uint256 tokenId_,
         bytes memory data_
     ) onlyOwner inTrading public virtual override {
+        _materialize(tokenId_);
         super.safeTransferFrom(from_, to_, tokenId_, data_);
         updateStudentId(from_, to_, tokenId_);
     }
 
+    function _initialize(
+        string memory name_,
+        string memory symbol_,
+        address uniAddr_,
+        uint256 semesterId_) internal {
+        _semesterName = name_;
+        _semesterSymbol = symbol_;
+        _university = University(uniAddr_);
+        // implementation contracts are deployed without a university
+        if (uniAddr_ != address(0)) {
+            _teacher = _university.teacher();
+            _student = _university.student();
+        }
+        currentState.state = Common.EState.planning;
+        semesterId = semesterId_;
+    }
+
+    function _addNewCourse(uint256 courseId_, uint16 numberOfStudents_, CourseHelper.Engine engine_) internal {
+        require(_courses[courseId_].created == false, "This course is already added!");
+        _courses[courseId_].created = true;
+        _courses[courseId_].limit = numberOfStudents_;
+        _courses[courseId_].engine = engine_;
+        _courseIds.push(courseId_);
+        emit AddNewCourse(courseId_, numberOfStudents_, uint8(engine_));
+    }
+
+    function _applyForCourse(uint256 courseId_, uint256 studentId_, uint256 index_) internal {
+        require(_courses[courseId_].created == true, "There is no course with given id!");
+        (bool isRemoved, uint256 removedStudentId) = _courses[courseId_].applyForCourse(studentId_,
+            (index_ + 1) * 1000 / 30  + _courses[courseId_].limit - _courses[courseId_].size());
+        emit ApplyForCourse(courseId_, studentId_,  _courses[courseId_].keys[studentId_]);
+        if (isRemoved) {
+            emit RemoveForCourse(courseId_, removedStudentId);
+        }
+    }
+
+    // the places are final from the trading state, so the seats are derived from them
+    function _seatsDerived() internal view returns (bool) {
+        Common.EState state = currentState.current();
+        return state != Common.EState.planning && state != Common.EState.applying;
+    }
+
+    // Returns the owner of an unclaimed seat token or zero if the token is not an unclaimed seat
+    function _seatOwner(uint256 tokenId_) internal view returns (address) {
+        if (!_seatsDerived()) {
+            return address(0);
+        }
+        uint256 studentId = uint128(tokenId_);
+        CourseHelper.Course storage course = _courses[tokenId_ >> 128];
+        if (!course.created || course.tokens[studentId] != 0 || !course.hasPlace(studentId)) {
+            return address(0);
+        }
+        return _student.ownerOf(studentId);
+    }
+
+    // Writes an unclaimed seat to storage on its first transfer or mark, other tokens are left as they are
+    function _materialize(uint256 tokenId_) internal {
+        address seatOwner = _seatOwner(tokenId_);
+        if (seatOwner == address(0)) {
+            return;
+        }
+        uint256 courseId = tokenId_ >> 128;
+        uint256 studentId = uint128(tokenId_);
+        super._mint(seatOwner, tokenId_);
+        _seats[tokenId_] = Seat({
+            mark: 0,
+            courseId: SafeCast.toUint64(courseId),
+            studentId: SafeCast.toUint128(studentId)
+        });
+        _courses[courseId].tokens[studentId] = tokenId_;
+        emit ClaimCourse(courseId, studentId, tokenId_);
+    }
+
     function updateStudentId(address from_, address to_, uint256 tokenId_) internal {
         if (from_ == owner()) {
-            studentIds[tokenId_] = _university.student().tokenOf(to_);
+            uint256 studentId = _student.tokenOf(to_);
+            _seats[tokenId_].studentId = SafeCast.toUint128(studentId);
+            if (studentId != 0) {
+                _receivedTokens[studentId].push(tokenId_);
+            }
         } else {
-            studentIds[tokenId_] = 0;
+            _seats[tokenId_].studentId = 0;
         }
     }
 
+    // a token which returns to a student after transfers is listed for the student again
+    function _listedBefore(uint256[] storage tokenIds_, uint256 position_) internal view returns (bool) {
+        for (uint256 i = 0; i < position_; i++) {
+            if (tokenIds_[i] == tokenIds_[position_]) {
+                return true;
+            }
+        }
+        return false;
+    }
+
     modifier inPlanning() {
         require(currentState.current() == Common.EState.planning, "This is not the planning state!");
         _;
@@ -145,12 +426,7 @@ contract Semester is Ownable, ISemester, ERC721 {
     }
 
     modifier onlyTeacher() {
-        require(_university.teacher().balanceOf(_msgSender()) == 1, "You must be a teacher!");
-        _;
-    }
-
-    modifier onlyStudent() {
-        require(_university.student().balanceOf(_msgSender()) == 1, "You must be a student!");
+        require(_teacher.balanceOf(_msgSender()) == 1, "You must be a teacher!");
         _;
     }
 }
\ No newline at end of file
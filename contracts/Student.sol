@@ -5,29 +5,104 @@ import "../interfaces/IStudent.sol";
 
 import "./Person.sol";
 
-contract Student is Person, IStudent {
-    using Counters for Counters.Counter;
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 
+contract Student is Person, IStudent {
     struct StudentInfo {
         uint16 sumCredits;
         uint16 sumMarks;
         bool hasValue;
+        // the semester of the last mark
+        uint32 lastSemester;
+    }
+
+    // totals of a student after a semester, packed into one storage slot
+    struct Checkpoint {
+        uint32 semesterId;
+        uint16 sumCredits;
+        uint16 sumMarks;
     }
 
     // study information of students
     mapping(uint256 => StudentInfo) public students;
+    // id of the last ended semester, the marks are given in the next one
+    uint256 public closedSemester;
+    // tokenid - totals after the semesters of the student which got marks, ordered by semester id
+    mapping(uint256 => Checkpoint[]) private _checkpoints;
 
     constructor(string memory name_, string memory symbol_) Person(name_, symbol_) {}
 
-    function mint(address to_) onlyOwner override public {
-        super.mint(to_);
-        students[_tokenId.current()].hasValue = true;
+    function addMark(uint8 mark_, uint8 credit_, uint256 tokenId_) onlyOwner public {
+        _addMark(mark_, credit_, tokenId_);
     }
 
-    function addMark(uint8 mark_, uint8 credit_, uint256 tokenId_) onlyOwner public {
-        require(students[tokenId_].hasValue, "There is no student with this id!");
-        students[tokenId_].sumCredits += credit_;
-        students[tokenId_].sumMarks += mark_;
+    // Adds the marks of a whole course, `marks_` and `tokenIds_` are parallel arrays
+    function addMarks(uint8[] calldata marks_, uint8 credit_, uint256[] calldata tokenIds_) onlyOwner public {
+        require(marks_.length == tokenIds_.length, "The number of marks and students differ!");
+        for (uint256 i = 0; i < tokenIds_.length; i++) {
+            _addMark(marks_[i], credit_, tokenIds_[i]);
+        }
+    }
+
+    // Ends the semester, the transcripts of the students are checkpointed when they get their next marks
+    function closeSemester(uint256 semesterId_) onlyOwner public {
+        require(semesterId_ > closedSemester, "The semester is already closed!");
+        closedSemester = semesterId_;
+        emit SemesterClosed(semesterId_);
+    }
+
+    // Returns the totals of a student after an ended semester
+    function transcriptAt(
+        uint256 tokenId_,
+        uint256 semesterId_
+    ) public view returns (uint16 sumCredits, uint16 sumMarks) {
+        StudentInfo storage student = students[tokenId_];
+        require(student.hasValue, "There is no student with this id!");
+        require(semesterId_ <= closedSemester, "The semester is not closed yet!");
+        if (student.lastSemester <= semesterId_) {
+            return (student.sumCredits, student.sumMarks);
+        }
+
+        // the last checkpoint which is not later than the semester
+        Checkpoint[] storage checkpoints = _checkpoints[tokenId_];
+        uint256 low = 0;
+        uint256 high = checkpoints.length;
+        while (low < high) {
+            uint256 middle = (low + high) / 2;
+            if (checkpoints[middle].semesterId > semesterId_) {
+                high = middle;
+            } else {
+                low = middle + 1;
+            }
+        }
+        if (low == 0) {
+            return (0, 0);
+        }
+        return (checkpoints[low - 1].sumCredits, checkpoints[low - 1].sumMarks);
+    }
+
+    function _addMark(uint8 mark_, uint8 credit_, uint256 tokenId_) internal {
+        StudentInfo storage student = students[tokenId_];
+        require(student.hasValue, "There is no student with this id!");
+        // the first mark of a semester saves the totals of the last semester with marks
+        uint32 semesterId = SafeCast.toUint32(closedSemester + 1);
+        if (student.lastSemester != semesterId) {
+            if (student.lastSemester != 0) {
+                _checkpoints[tokenId_].push(Checkpoint({
+                    semesterId: student.lastSemester,
+                    sumCredits: student.sumCredits,
+                    sumMarks: student.sumMarks
+                }));
+            }
+            student.lastSemester = semesterId;
+        }
+        student.sumCredits += credit_;
+        student.sumMarks += mark_;
         emit Marked(tokenId_, mark_, credit_);
     }
+
+    function _mintPerson(address to_, uint256 tokenId_) internal override {
+        super._mintPerson(to_, tokenId_);
+        students[tokenId_].hasValue = true;
+    }
 }
\ No newline at end of file
@@ -0,0 +1,46 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "../Library/CourseHelper.sol";
+
+/**
+ * @dev Thin wrapper around a single CourseHelper course so that its keys can be walked from tests.
+ */
+contract CourseHelperMock {
+    using CourseHelper for CourseHelper.Course;
+
+    CourseHelper.Course private _course;
+
+    constructor(uint16 limit_) {
+        _course.created = true;
+        _course.limit = limit_;
+    }
+
+    function applyForCourse(uint256 student_, uint index_) public returns (bool, uint256) {
+        return _course.applyForCourse(student_, index_);
+    }
+
+    function first() public view returns (uint) {
+        return _course.first();
+    }
+
+    function last() public view returns (uint) {
+        return _course.last();
+    }
+
+    function next(uint key_) public view returns (uint) {
+        return _course.next(key_);
+    }
+
+    // keys of the course walked from {first} with {next}, lowest first
+    function keys() public view returns (uint[] memory keys_) {
+        keys_ = new uint[](_course.size());
+        if (keys_.length == 0) {
+            return keys_;
+        }
+        keys_[0] = _course.first();
+        for (uint256 i = 1; i < keys_.length; i++) {
+            keys_[i] = _course.next(keys_[i - 1]);
+        }
+    }
+}
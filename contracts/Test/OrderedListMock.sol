@@ -0,0 +1,64 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "../Library/OrderedList.sol";
+
+/**
+ * @dev Thin wrapper around OrderedList so that the tree can be driven and inspected from tests.
+ */
+contract OrderedListMock {
+    using OrderedList for OrderedList.Tree;
+
+    // number of keys in the tree
+    uint256 public size;
+
+    OrderedList.Tree private _tree;
+
+    function insert(uint key_) public {
+        _tree.insert(key_);
+        size++;
+    }
+
+    function remove(uint key_) public {
+        _tree.remove(key_);
+        size--;
+    }
+
+    function first() public view returns (uint) {
+        return _tree.first();
+    }
+
+    function last() public view returns (uint) {
+        return _tree.last();
+    }
+
+    function next(uint key_) public view returns (uint) {
+        return _tree.next(key_);
+    }
+
+    // keys of the tree in ascending order
+    function keys() public view returns (uint[] memory keys_) {
+        keys_ = new uint[](size);
+        uint key = _tree.first();
+        for (uint256 i = 0; i < size; i++) {
+            keys_[i] = key;
+            key = _tree.next(key);
+        }
+    }
+
+    // number of nodes on the longest path from the root to a leaf
+    function depth() public view returns (uint256 depth_) {
+        uint key = _tree.first();
+        while (!OrderedList.isEmpty(key)) {
+            uint256 nodeDepth = 1;
+            for (uint cursor = _tree.nodes[key].parent; !OrderedList.isEmpty(cursor);
+                cursor = _tree.nodes[cursor].parent) {
+                nodeDepth++;
+            }
+            if (nodeDepth > depth_) {
+                depth_ = nodeDepth;
+            }
+            key = _tree.next(key);
+        }
+    }
+}
@@ -29,6 +29,17 @@ contract ERC1238 is Context, ERC165, IERC1238, IERC1238Metadata {
     // Mapping for token URIs
     mapping(uint256 => string) private _tokenURIs;
 
+    // Mapping for token content hashes, the fixed-size alternative of the token URIs
+    mapping(uint256 => bytes32) private _tokenContentHashes;
+
+    // Shared prefix of the URIs built from the content hashes
+    string private _baseURI;
+
+    // IPFS CIDv1 prefix of a raw block with a sha2-256 digest in base16, used without a base URI
+    string private constant _DEFAULT_BASE_URI = "ipfs://f01551220";
+
+    bytes16 private constant _HEX_SYMBOLS = "0123456789abcdef";
+
     constructor(string memory name_, string memory symbol_) {
         _name = name_;
         _symbol = symbol_;
@@ -58,9 +69,23 @@ contract ERC1238 is Context, ERC165, IERC1238, IERC1238Metadata {
      */
     function tokenURI(uint256 tokenId_) public view virtual override returns (string memory) {
         require(_exists(tokenId_), "ERC1238URIStorage: URI query for nonexistent token");
+        bytes32 contentHash = _tokenContentHashes[tokenId_];
+        if (contentHash != 0) {
+            return string(abi.encodePacked(baseURI(), _toHexString(contentHash)));
+        }
         return _tokenURIs[tokenId_];
     }
 
+    /// @dev Returns the prefix of the token URIs which are built from a content hash.
+    function baseURI() public view virtual returns (string memory) {
+        return bytes(_baseURI).length == 0 ? _DEFAULT_BASE_URI : _baseURI;
+    }
+
+    /// @dev Returns the content hash of `tokenId` token, zero if it has none.
+    function tokenContentHash(uint256 tokenId_) public view virtual returns (bytes32) {
+        return _tokenContentHashes[tokenId_];
+    }
+
     // Returns the number of tokens owned by `owner`
     function balanceOf(address owner_) public view virtual override returns (uint256) {
         require(owner_ != address(0), "Invalid owner at zero address");
@@ -106,17 +131,60 @@ contract ERC1238 is Context, ERC165, IERC1238, IERC1238Metadata {
         if (bytes(_tokenURIs[tokenId_]).length != 0) {
             delete _tokenURIs[tokenId_];
         }
+        if (_tokenContentHashes[tokenId_] != 0) {
+            delete _tokenContentHashes[tokenId_];
+        }
 
         emit Burned(owner, tokenId_);
     }
 
+    /// @dev Sets the badge's name and symbol, used by contracts initialized without a constructor.
+    function _setNameAndSymbol(string memory name_, string memory symbol_) internal virtual {
+        _name = name_;
+        _symbol = symbol_;
+    }
+
     /**
      * @dev Sets `_tokenURI` as the tokenURI of `tokenId`.
      */
     function _setTokenURI(uint256 tokenId_, string memory tokenURI_) internal virtual {
         require(_exists(tokenId_), "ERC1238URIStorage: URI set of nonexistent token");
         require(_owners[tokenId_] == _msgSender(), "ERC1238URIStorage: Sender address is not the owner of the token!");
+        if (_tokenContentHashes[tokenId_] != 0) {
+            delete _tokenContentHashes[tokenId_];
+        }
         _tokenURIs[tokenId_] = tokenURI_;
         emit TokenURISet(tokenId_, tokenURI_);
     }
+
+    /**
+     * @dev Sets `contentHash_` as the content hash of `tokenId`, its URI is the base URI followed by the hash.
+     *
+     * Only one slot is written whatever the length of the URI is, a previously set URI string is removed.
+     */
+    function _setTokenContentHash(uint256 tokenId_, bytes32 contentHash_) internal virtual {
+        require(_exists(tokenId_), "ERC1238URIStorage: URI set of nonexistent token");
+        require(_owners[tokenId_] == _msgSender(), "ERC1238URIStorage: Sender address is not the owner of the token!");
+        require(contentHash_ != 0, "ERC1238URIStorage: The content hash is zero!");
+        if (bytes(_tokenURIs[tokenId_]).length != 0) {
+            delete _tokenURIs[tokenId_];
+        }
+        _tokenContentHashes[tokenId_] = contentHash_;
+        emit TokenURISet(tokenId_, tokenURI(tokenId_));
+    }
+
+    /// @dev Sets the shared prefix of the URIs built from a content hash.
+    function _setBaseURI(string memory baseURI_) internal virtual {
+        _baseURI = baseURI_;
+    }
+
+    /// @dev Returns the 64 lowercase hexadecimal digits of `value_` without a prefix.
+    function _toHexString(bytes32 value_) private pure returns (string memory) {
+        bytes memory buffer = new bytes(64);
+        for (uint256 i = 0; i < 32; i++) {
+            buffer[2 * i] = _HEX_SYMBOLS[uint8(value_[i]) >> 4];
+            buffer[2 * i + 1] = _HEX_SYMBOLS[uint8(value_[i]) & 0x0f];
+        }
+        return string(buffer);
+    }
 }
\ No newline at end of file
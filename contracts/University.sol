@@ -11,12 +11,26 @@ import "./Semester.sol";
 import "./Student.sol";
 
 import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/proxy/Clones.sol";
 import "@openzeppelin/contracts/utils/Counters.sol";
 
 contract University is Ownable, IUniversity {
     using Counters for Counters.Counter;
     using Common for Common.State;
 
+    // Implementation contracts which are cloned (EIP-1167) instead of deploying new contracts,
+    // a zero address means that the given contract is fully deployed
+    struct Implementations {
+        address teacher;
+        address student;
+        address courseCatalog;
+        address degree;
+        address semester;
+    }
+
+    // implementation contract of the semesters
+    address public immutable semesterImplementation;
+
     // current ongoing semester id
     Counters.Counter public semesterId;
     // current state of the university
@@ -25,19 +39,54 @@ contract University is Ownable, IUniversity {
     mapping(uint256 => Semester) public semesters;
 
     // smart contract for tracking teachers
-    Person public teacher;
+    Person public immutable teacher;
     // smart contract for tracking students
-    Student public student;
+    Student public immutable student;
     // smart contract for tracking minted degrees
-    Degree public degree;
+    Degree public immutable degree;
     // smart contract for tracking available courses at university
-    CourseCatalog public courseCatalog;
+    CourseCatalog public immutable courseCatalog;
+
+    constructor(Implementations memory implementations_) {
+        semesterImplementation = implementations_.semester;
+
+        // immutables cannot be read in the constructor, so the contracts are set up through local variables
+        Person teacher_;
+        if (implementations_.teacher == address(0)) {
+            teacher_ = new Person("Teacher", "tch");
+        } else {
+            teacher_ = Person(Clones.clone(implementations_.teacher));
+            teacher_.initialize("Teacher", "tch");
+        }
+        teacher = teacher_;
+
+        Student student_;
+        if (implementations_.student == address(0)) {
+            student_ = new Student("Student", "std");
+        } else {
+            student_ = Student(Clones.clone(implementations_.student));
+            student_.initialize("Student", "std");
+        }
+        student = student_;
+
+        CourseCatalog courseCatalog_;
+        if (implementations_.courseCatalog == address(0)) {
+            courseCatalog_ = new CourseCatalog("CourseCatalog", "coc", address(this), address(teacher_));
+        } else {
+            courseCatalog_ = CourseCatalog(Clones.clone(implementations_.courseCatalog));
+            courseCatalog_.initialize("CourseCatalog", "coc", address(this), address(teacher_));
+        }
+        courseCatalog = courseCatalog_;
+
+        Degree degree_;
+        if (implementations_.degree == address(0)) {
+            degree_ = new Degree("Degree", "deg");
+        } else {
+            degree_ = Degree(Clones.clone(implementations_.degree));
+            degree_.initialize("Degree", "deg");
+        }
+        degree = degree_;
 
-    constructor() {
-        teacher = new Person("Teacher", "tch");
-        student = new Student("Student", "std");
-        courseCatalog = new CourseCatalog("CourseCatalog", "coc", address(this));
-        degree = new Degree("Degree", "deg");
         currentState.init();
     }
 
@@ -46,6 +95,10 @@ contract University is Ownable, IUniversity {
         teacher.mint(to_);
     }
 
+    function createTeachers(address[] calldata to_) onlyOwner inOffSeason public {
+        teacher.mintBatch(to_);
+    }
+
     function addMyCourseNextSemester(
         uint256 courseId_,
         uint8 numberOfStudents_
@@ -54,12 +107,33 @@ contract University is Ownable, IUniversity {
         semesters[semesterId.current()].addNewCourse(courseId_, numberOfStudents_);
     }
 
+    function addMyCourseNextSemester(
+        uint256 courseId_,
+        uint8 numberOfStudents_,
+        CourseHelper.Engine engine_
+    ) onlyTeacher inPlanning public {
+        require(courseCatalog.ownerOf(courseId_) == _msgSender(), "You do not own this token!");
+        semesters[semesterId.current()].addNewCourse(courseId_, numberOfStudents_, engine_);
+    }
+
     function markStudent(uint256 tokenId_, uint8 mark_) onlyTeacher inActice public {
-        require(courseCatalog.ownerOf(semesters[semesterId.current()].courseIds(tokenId_)) == _msgSender(),
-            "You are not the owner of the course!");
-        semesters[semesterId.current()].markStudent(tokenId_, mark_);
-        student.addMark(mark_, courseCatalog.creditValues(tokenId_),
-            semesters[semesterId.current()].studentIds(tokenId_));
+        // the mark is reverted with the whole transaction if the sender does not own the course
+        (uint256 courseId, uint256 studentId) = semesters[semesterId.current()].markStudent(tokenId_, mark_);
+        (address courseOwner, uint8 creditValue) = courseCatalog.courseOf(courseId);
+        require(courseOwner == _msgSender(), "You are not the owner of the course!");
+        student.addMark(mark_, creditValue, studentId);
+    }
+
+    // Marks a whole course roster, `tokenIds_` are semester tokens with the corresponding `marks_`
+    function markStudents(
+        uint256 courseId_,
+        uint256[] calldata tokenIds_,
+        uint8[] calldata marks_
+    ) onlyTeacher inActice public {
+        (address courseOwner, uint8 creditValue) = courseCatalog.courseOf(courseId_);
+        require(courseOwner == _msgSender(), "You are not the owner of the course!");
+        uint256[] memory studentIds = semesters[semesterId.current()].markStudents(courseId_, tokenIds_, marks_);
+        student.addMarks(marks_, creditValue, studentIds);
     }
 
     // Student
@@ -67,9 +141,13 @@ contract University is Ownable, IUniversity {
         student.mint(to_);
     }
 
+    function createStudents(address[] calldata to_) onlyOwner inOffSeason public {
+        student.mintBatch(to_);
+    }
+
     function mintDegree(uint256 tokenId_) onlyStudent inOffSeason public {
         require(student.ownerOf(tokenId_) == _msgSender(), "Sender does not own the token!");
-        (uint16 sumCredits, uint16 sumMarks,) = student.students(tokenId_);
+        (uint16 sumCredits, uint16 sumMarks,,) = student.students(tokenId_);
         require(sumCredits >= 180, "You do not have enough credits!");
         degree.mint(_msgSender(), sumMarks, sumCredits);
     }
@@ -81,9 +159,28 @@ contract University is Ownable, IUniversity {
     }
 
     function applyForCourse(uint256 courseId_, uint256 studentId_) onlyStudent inApplying public {
-        require(student.ownerOf(studentId_) == _msgSender(), "You are not the owner this id!");
-        (uint16 sumcredits, uint16 sumMarks,) = student.students(studentId_);
-        semesters[semesterId.current()].applyForCourse(courseId_, studentId_, sumMarks * sumcredits);
+        semesters[semesterId.current()].applyForCourse(courseId_, studentId_, _applicationIndex(studentId_));
+    }
+
+    function applyForCourses(uint256[] calldata courseIds_, uint256 studentId_) onlyStudent inApplying public {
+        semesters[semesterId.current()].applyForCourses(courseIds_, studentId_, _applicationIndex(studentId_));
+    }
+
+    // Submits the roster of an off-chain course of the current semester, lowest index first
+    function allocateCourse(
+        uint256 courseId_,
+        uint256[] calldata studentIds_,
+        uint256[] calldata indexes_
+    ) onlyOwner inTrading public {
+        semesters[semesterId.current()].allocate(courseId_, studentIds_, indexes_);
+    }
+
+    // Sets the prefix of the token URIs built from content hashes in every token contract of the university
+    function setBaseURI(string calldata baseURI_) onlyOwner public {
+        teacher.setBaseURI(baseURI_);
+        student.setBaseURI(baseURI_);
+        courseCatalog.setBaseURI(baseURI_);
+        degree.setBaseURI(baseURI_);
     }
 
     // Semester
@@ -91,13 +188,28 @@ contract University is Ownable, IUniversity {
         require(currentState.current() == Common.EState.offSeason);
         semesterId.increment();
         // TODO perhaps semester id used in the contract name
-        semesters[semesterId.current()] = new Semester("Semester", "sem", address(this), semesterId.current());
+        if (semesterImplementation == address(0)) {
+            semesters[semesterId.current()] = new Semester("Semester", "sem", address(this), semesterId.current());
+        } else {
+            Semester semester = Semester(Clones.clone(semesterImplementation));
+            semester.initialize("Semester", "sem", address(this), semesterId.current());
+            semesters[semesterId.current()] = semester;
+        }
         currentState.nextState();
     }
 
     function setNextState() onlyOwner public {
         semesters[semesterId.current()].setNextState();
         currentState.nextState();
+        if (currentState.current() == Common.EState.offSeason) {
+            student.closeSemester(semesterId.current());
+        }
+    }
+
+    function _applicationIndex(uint256 studentId_) internal view returns (uint256) {
+        require(student.ownerOf(studentId_) == _msgSender(), "You are not the owner this id!");
+        (uint16 sumcredits, uint16 sumMarks,,) = student.students(studentId_);
+        return sumMarks * sumcredits;
     }
 
     modifier onlyTeacher() {
@@ -0,0 +1,43 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "./Library/Common.sol";
+import "./Semester.sol";
+import "./University.sol";
+
+/**
+ * @dev Read-only views which collect data of the university contracts in a single call.
+ *
+ * It holds no state, so one deployment can serve any university.
+ * Course rosters are returned by {Semester-roster} directly.
+ */
+contract UniversityLens {
+    // Returns the address and the current state of every semester, indexed by semester id - 1
+    function semesterStates(
+        University university_
+    ) public view returns (address[] memory semesters, Common.EState[] memory states) {
+        uint256 numberOfSemesters = university_.semesterId();
+        semesters = new address[](numberOfSemesters);
+        states = new Common.EState[](numberOfSemesters);
+        for (uint256 i = 0; i < numberOfSemesters; i++) {
+            Semester semester = university_.semesters(i + 1);
+            semesters[i] = address(semester);
+            states[i] = semester.currentState();
+        }
+    }
+
+    // Returns the seat tokens of a student in a semester with their courses and marks, see {Semester-tokensOf}
+    function seatsOf(
+        Semester semester_,
+        uint256 studentId_
+    ) public view returns (uint256[] memory tokenIds, uint256[] memory courseIds, uint8[] memory marks) {
+        // the semester indexes the tokens per student, so the cost does not grow with the semester
+        tokenIds = semester_.tokensOf(studentId_);
+        courseIds = new uint256[](tokenIds.length);
+        marks = new uint8[](tokenIds.length);
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            courseIds[i] = semester_.courseIds(tokenIds[i]);
+            marks[i] = semester_.marks(tokenIds[i]);
+        }
+    }
+}
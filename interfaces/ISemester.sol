@@ -6,10 +6,11 @@ pragma solidity ^0.8.0;
  * @dev Required interface of a Semester compliant contract.
  */
 interface ISemester {
-    /// @dev Emitted when `tokenId` token is minted with `creditValue`.
+    /// @dev Emitted when `courseId` course is added for `numberOfStudents` students, ordered by `engine`.
     event AddNewCourse(
         uint256 indexed courseId,
-        uint16 indexed numberOfStudents
+        uint16 indexed numberOfStudents,
+        uint8 engine
     );
 
     /// @dev Emitted when semester sets a `newState`.
@@ -36,6 +37,15 @@ interface ISemester {
         uint256 indexed studentId
     );
 
+    /// @dev Emitted when the roster of the off-chain `courseId` course is verified. It holds `numberOfStudents`
+    /// students, the lowest of them applied with `cutoffIndex` and has `cutoffStudentId`.
+    event AllocateCourse(
+        uint256 indexed courseId,
+        uint256 numberOfStudents,
+        uint256 cutoffIndex,
+        uint256 cutoffStudentId
+    );
+
     /// @dev Emitted when `tokenId` token is minted with the owner of `studentId` token in the `courseId` course.
     event ClaimCourse(
         uint256 indexed courseId,
@@ -12,4 +12,9 @@ interface IStudent {
         uint8 indexed mark,
         uint8 indexed credit
     );
+
+    /// @dev Emitted when the `semesterId` semester ends and its marks become part of the transcripts.
+    event SemesterClosed(
+        uint256 indexed semesterId
+    );
 }
\ No newline at end of file
@@ -1,6 +1,19 @@
-from brownie import CourseHelper, University, accounts
+from brownie import ZERO_ADDRESS, CourseCatalog, CourseHelper, Degree, Person, Semester, Student, University, accounts
 
 def main():
     account = accounts.load('deployment_account')
     CourseHelper.deploy({'from': account})
-    University.deploy({'from': account})
\ No newline at end of file
+    University.deploy((ZERO_ADDRESS,) * 5, {'from': account})
+
+def clones():
+    # the implementation contracts can be shared by several universities
+    account = accounts.load('deployment_account')
+    CourseHelper.deploy({'from': account})
+    implementations = (
+        Person.deploy("Teacher", "tch", {'from': account}),
+        Student.deploy("Student", "std", {'from': account}),
+        CourseCatalog.deploy("CourseCatalog", "coc", ZERO_ADDRESS, ZERO_ADDRESS, {'from': account}),
+        Degree.deploy("Degree", "deg", {'from': account}),
+        Semester.deploy("Semester", "sem", ZERO_ADDRESS, 0, {'from': account}),
+    )
+    University.deploy([implementation.address for implementation in implementations], {'from': account})
@@ -0,0 +1,284 @@
+"""Incremental indexer mirroring the events of a University deployment into SQLite.
+
+Run it against a deployment with
+
+    UNIVERSITY_ADDRESS=0x... brownie run indexer --network <network>
+
+The database (INDEXER_DATABASE, university.db by default) keeps the last indexed
+block, so a restarted indexer continues where it stopped. Rosters, evictions,
+claimed places and transcripts can then be read from the database instead of
+calling the contracts again.
+"""
+import os
+import sqlite3
+import time
+
+from brownie import CourseCatalog, Degree, Person, Semester, Student, University, web3
+from brownie.network.contract import Contract
+from eth_event import decode_log, get_topic_map
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    university TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS semesters (
+    semester_id INTEGER PRIMARY KEY,
+    address TEXT NOT NULL UNIQUE,
+    state INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    semester_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    engine INTEGER NOT NULL,
+    allocated INTEGER NOT NULL,
+    PRIMARY KEY (semester_id, course_id)
+);
+CREATE TABLE IF NOT EXISTS applications (
+    semester_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    credit_index INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS course_students (
+    semester_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    credit_index INTEGER NOT NULL,
+    PRIMARY KEY (semester_id, course_id, student_id)
+);
+CREATE TABLE IF NOT EXISTS evictions (
+    semester_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seats (
+    semester_id INTEGER NOT NULL,
+    -- the id of a derived seat does not fit into an INTEGER, see Semester.seatTokenId
+    token_id TEXT NOT NULL,
+    course_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    mark INTEGER,
+    PRIMARY KEY (semester_id, token_id)
+);
+CREATE TABLE IF NOT EXISTS marks (
+    student_id INTEGER NOT NULL,
+    mark INTEGER NOT NULL,
+    credit INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mints (
+    contract TEXT NOT NULL,
+    token_id INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    PRIMARY KEY (contract, token_id)
+);
+CREATE TABLE IF NOT EXISTS degrees (
+    token_id INTEGER PRIMARY KEY,
+    credit_value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS course_students_by_index ON course_students (semester_id, course_id, credit_index);
+CREATE INDEX IF NOT EXISTS evictions_by_course ON evictions (semester_id, course_id);
+CREATE INDEX IF NOT EXISTS seats_by_student ON seats (semester_id, student_id);
+CREATE INDEX IF NOT EXISTS marks_by_student ON marks (student_id);
+"""
+
+# Common.EState values in which the places are not final yet, there are no derived seats
+PLANNING, APPLYING = 1, 2
+# CourseHelper.Engine value of a course whose places are final once its roster is allocated
+OFF_CHAIN = 2
+
+class Indexer:
+    """Follows the logs of a University and its semesters in block ranges of `batch_blocks`."""
+
+    def __init__(self, university_address, database=":memory:", start_block=0, batch_blocks=2000):
+        self.university = Contract.from_abi("University", university_address, University.abi)
+        self.start_block = start_block
+        self.batch_blocks = batch_blocks
+        self.db = sqlite3.connect(database)
+        self.db.executescript(SCHEMA)
+
+        self.registries = {
+            self.university.teacher(): "teacher",
+            self.university.student(): "student",
+            self.university.courseCatalog(): "courseCatalog",
+            self.university.degree(): "degree",
+        }
+        self.topic_map = {}
+        for container in (Semester, Person, Student, CourseCatalog, Degree):
+            self.topic_map.update(get_topic_map(container.abi))
+        # semester address - semester id
+        self.semesters = {address: semester_id for semester_id, address in
+                          self.db.execute("SELECT semester_id, address FROM semesters")}
+
+    @property
+    def last_block(self):
+        row = self.db.execute("SELECT block FROM checkpoints WHERE university = ?",
+                              (self.university.address,)).fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync(self, to_block=None):
+        """Indexes every block after the checkpoint up to `to_block` (the latest block by default)."""
+        head = web3.eth.block_number if to_block is None else to_block
+        from_block = self.last_block + 1
+        while from_block <= head:
+            to_block = min(from_block + self.batch_blocks - 1, head)
+            self._index_range(from_block, to_block)
+            from_block = to_block + 1
+        return head
+
+    def follow(self, poll_interval=2):
+        while True:
+            self.sync()
+            time.sleep(poll_interval)
+
+    def _index_range(self, from_block, to_block):
+        # the semesters are discovered at the end of the range, so no log of them is missed
+        self._discover_semesters(to_block)
+        logs = web3.eth.get_logs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": list(self.registries) + list(self.semesters),
+        })
+        # consecutive rows of the same statement are inserted in bulk, in the order of the logs
+        batches = []
+        for log in logs:
+            for statement, parameters in self._rows(log):
+                if batches and batches[-1][0] == statement:
+                    batches[-1][1].append(parameters)
+                else:
+                    batches.append((statement, [parameters]))
+        with self.db:
+            for statement, parameters in batches:
+                self.db.executemany(statement, parameters)
+            self.db.execute("INSERT OR REPLACE INTO checkpoints (university, block) VALUES (?, ?)",
+                            (self.university.address, to_block))
+
+    def _discover_semesters(self, block):
+        last_semester_id = self.university.semesterId(block_identifier=block)
+        new_semesters = []
+        for semester_id in range(len(self.semesters) + 1, last_semester_id + 1):
+            address = self.university.semesters(semester_id, block_identifier=block)
+            self.semesters[address] = semester_id
+            # a new semester starts in the planning state
+            new_semesters.append((semester_id, address, 1))
+        if new_semesters:
+            with self.db:
+                self.db.executemany("INSERT OR IGNORE INTO semesters VALUES (?, ?, ?)", new_semesters)
+
+    def _rows(self, log):
+        """Returns the (statement, parameters) pairs which apply `log` to the database."""
+        if not log["topics"] or "0x" + bytes(log["topics"][0]).hex() not in self.topic_map:
+            return []
+        event = decode_log(log, self.topic_map)
+        name = event["name"]
+        values = {item["name"]: item["value"] for item in event["data"]}
+        position = (log["blockNumber"], log["logIndex"])
+
+        if log["address"] in self.semesters:
+            semester_id = self.semesters[log["address"]]
+            if name == "AddNewCourse":
+                return [("INSERT OR REPLACE INTO courses VALUES (?, ?, ?, 0)",
+                         (semester_id, values["courseId"], values["engine"]))]
+            if name == "ApplyForCourse":
+                return [
+                    ("INSERT INTO applications VALUES (?, ?, ?, ?, ?, ?)",
+                     (semester_id, values["courseId"], values["studentId"], values["index"], *position)),
+                    ("INSERT OR REPLACE INTO course_students VALUES (?, ?, ?, ?)",
+                     (semester_id, values["courseId"], values["studentId"], values["index"])),
+                ]
+            if name == "RemoveForCourse":
+                return [
+                    ("INSERT INTO evictions VALUES (?, ?, ?, ?, ?)",
+                     (semester_id, values["courseId"], values["studentId"], *position)),
+                    ("DELETE FROM course_students WHERE semester_id = ? AND course_id = ? AND student_id = ?",
+                     (semester_id, values["courseId"], values["studentId"])),
+                ]
+            if name == "AllocateCourse":
+                allocated = ("UPDATE courses SET allocated = 1 WHERE semester_id = ? AND course_id = ?",
+                             (semester_id, values["courseId"]))
+                # an off-chain course keeps every application until its roster is verified
+                if values["numberOfStudents"] == 0:
+                    return [allocated, ("DELETE FROM course_students WHERE semester_id = ? AND course_id = ?",
+                                        (semester_id, values["courseId"]))]
+                return [allocated, ("DELETE FROM course_students WHERE semester_id = ? AND course_id = ? AND "
+                                    "(credit_index < ? OR (credit_index = ? AND student_id < ?))",
+                                    (semester_id, values["courseId"], values["cutoffIndex"], values["cutoffIndex"],
+                                     values["cutoffStudentId"]))]
+            if name == "ClaimCourse":
+                return [("INSERT OR REPLACE INTO seats VALUES (?, ?, ?, ?, NULL)",
+                         (semester_id, str(values["tokenId"]), values["courseId"], values["studentId"]))]
+            if name == "StudentMarked":
+                return [("UPDATE seats SET mark = ? WHERE semester_id = ? AND token_id = ?",
+                         (values["mark"], semester_id, str(values["tokenId"])))]
+            if name == "SetNextState":
+                return [("UPDATE semesters SET state = ? WHERE semester_id = ?", (values["newState"], semester_id))]
+        elif log["address"] in self.registries:
+            registry = self.registries[log["address"]]
+            if name == "Marked" and registry == "student":
+                return [("INSERT INTO marks VALUES (?, ?, ?, ?, ?)",
+                         (values["tokenId"], values["mark"], values["credit"], *position))]
+            if name == "Minted":
+                return [("INSERT OR REPLACE INTO mints VALUES (?, ?, ?)", (registry, values["tokenId"], values["to"]))]
+            if name == "CreditValue" and registry == "degree":
+                return [("INSERT OR REPLACE INTO degrees VALUES (?, ?)", (values["tokenId"], values["creditValue"]))]
+        return []
+
+    # Reads
+
+    def roster(self, semester_id, course_id):
+        """(credit index, student id) pairs of a course, lowest index first."""
+        return self.db.execute(
+            "SELECT credit_index, student_id FROM course_students WHERE semester_id = ? AND course_id = ? "
+            "ORDER BY credit_index, student_id", (semester_id, course_id)).fetchall()
+
+    def evicted(self, semester_id, course_id):
+        """Student ids removed from a course, in the order of their removal."""
+        return [row[0] for row in self.db.execute(
+            "SELECT student_id FROM evictions WHERE semester_id = ? AND course_id = ? ORDER BY block, log_index",
+            (semester_id, course_id))]
+
+    def seats_of(self, semester_id, student_id):
+        """(token id, course id, mark) of the seats of a student in a semester, ordered by token id.
+
+        From the trading state an unclaimed place is listed as its derived seat, see Semester.seatTokenId,
+        until the seat is stored by its first transfer or mark.
+        """
+        seats = [(int(token_id), course_id, mark) for token_id, course_id, mark in self.db.execute(
+            "SELECT token_id, course_id, COALESCE(mark, 0) FROM seats WHERE semester_id = ? AND student_id = ?",
+            (semester_id, student_id))]
+        derived = self.db.execute(
+            "SELECT course_students.course_id FROM course_students "
+            "JOIN semesters ON semesters.semester_id = course_students.semester_id "
+            "JOIN courses ON courses.semester_id = course_students.semester_id "
+            "AND courses.course_id = course_students.course_id "
+            "WHERE course_students.semester_id = ? AND course_students.student_id = ? "
+            "AND semesters.state NOT IN (?, ?) AND (courses.engine != ? OR courses.allocated = 1) "
+            "AND NOT EXISTS (SELECT 1 FROM seats WHERE seats.semester_id = course_students.semester_id "
+            "AND seats.course_id = course_students.course_id AND seats.student_id = course_students.student_id)",
+            (semester_id, student_id, PLANNING, APPLYING, OFF_CHAIN))
+        seats += [(course_id << 128 | student_id, course_id, 0) for course_id, in derived]
+        return sorted(seats)
+
+    def transcript(self, student_id):
+        """(sum of credits, sum of marks) of a student, the same as `Student.students`."""
+        return self.db.execute(
+            "SELECT COALESCE(SUM(credit), 0), COALESCE(SUM(mark), 0) FROM marks WHERE student_id = ?",
+            (student_id,)).fetchone()
+
+    def semester_states(self):
+        return self.db.execute("SELECT semester_id, state FROM semesters ORDER BY semester_id").fetchall()
+
+
+def main():
+    indexer = Indexer(
+        os.environ["UNIVERSITY_ADDRESS"],
+        os.environ.get("INDEXER_DATABASE", "university.db"),
+        start_block=int(os.environ.get("INDEXER_START_BLOCK", 0)),
+    )
+    indexer.follow(float(os.environ.get("INDEXER_POLL_INTERVAL", 2)))
@@ -0,0 +1,319 @@
+"""End-to-end load simulation of full semesters on a development chain.
+
+    brownie run simulate --network development
+
+The workload is configured by environment variables:
+
+    SIM_TEACHERS, SIM_STUDENTS, SIM_COURSES   size of the university (10, 200, 20)
+    SIM_SEMESTERS                             number of simulated semesters (3)
+    SIM_APPLICATIONS                          courses a student applies for per semester (3)
+    SIM_CAPACITY                              places of all courses per application (0.7)
+    SIM_ZIPF                                  skew of the course popularity, 0 is uniform (1.0)
+    SIM_CLAIM_RATE                            share of the places which are claimed (0.95)
+    SIM_ENGINE                                tree, heap or offChain (tree)
+    SIM_DEPLOYMENT                            full or clone (full)
+    SIM_SEED                                  seed of every random choice (1238)
+    SIM_STORAGE_SAMPLE                        traced transactions per operation and phase (2)
+    SIM_SCENARIO                              scenario file (reports/scenario.json)
+    SIM_REPORT                                report file (reports/simulation.json)
+
+The generated scenario is written to SIM_SCENARIO. If the file already exists it is replayed
+instead, so two builds of the contracts can be compared on the same workload. The report holds
+the transactions per second and the gas of every operation type per phase, and the storage
+growth estimated from traced samples. The seats are not transferred: the transfers of a
+semester are restricted to its owner, the University, which does not expose them.
+"""
+import json
+import math
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from brownie import ZERO_ADDRESS, CourseCatalog, CourseHelper, Degree, Person, Semester, Student, University
+from brownie import accounts, web3
+from brownie.exceptions import VirtualMachineError
+from brownie.network.contract import Contract
+
+ENGINES = {"tree": 0, "heap": 1, "offChain": 2}
+# the number of accounts onboarded by one transaction
+BATCH = 200
+CREDITS = (30, 45, 60)
+DEGREE_CREDITS = 180
+FUNDING = "0.1 ether"
+
+
+def generate(config):
+    """The whole workload of `config`, every random choice is made here from the seed."""
+    rng = random.Random(config["seed"])
+    courses = range(config["courses"])
+    weights = [1 / (rank + 1) ** config["zipf"] for rank in courses]
+    limit = config["students"] * config["applications"] * config["capacity"] / config["courses"]
+    scenario = {
+        "config": config,
+        "course_teachers": [course % config["teachers"] for course in courses],
+        "course_credits": [rng.choice(CREDITS) for _ in courses],
+        "course_limits": [max(1, min(255, round(limit)))] * config["courses"],
+        "semesters": [],
+    }
+    for _ in range(config["semesters"]):
+        order = list(range(config["students"]))
+        rng.shuffle(order)
+        choices = []
+        for _ in order:
+            chosen = set()
+            while len(chosen) < min(config["applications"], config["courses"]):
+                chosen.add(rng.choices(courses, weights)[0])
+            # whether the place is claimed and its mark are drawn for every application, used if it gets a place
+            choices.append([(course, rng.random() < config["claim_rate"], rng.randint(1, 5))
+                            for course in sorted(chosen)])
+        scenario["semesters"].append({"order": order, "choices": choices})
+    return scenario
+
+
+def percentile(ordered, share):
+    return ordered[math.ceil(share * len(ordered)) - 1] if ordered else 0
+
+
+class Phase:
+    """Sends the transactions of a phase and collects their gas and the storage samples."""
+
+    def __init__(self, name, storage_sample):
+        self.name = name
+        self.storage_sample = storage_sample
+        self.gas = defaultdict(list)
+        self.reverted = Counter()
+        self.samples = defaultdict(list)
+        self.seconds = 0
+
+    def send(self, operation, function, *args, sender):
+        return self.record(operation, lambda: function(*args, {'from': sender, 'silent': True}))
+
+    def record(self, operation, send):
+        start = time.perf_counter()
+        try:
+            tx = send()
+        except VirtualMachineError:
+            self.reverted[operation] += 1
+            return None
+        finally:
+            self.seconds += time.perf_counter() - start
+        self.gas[operation].append(tx.gas_used)
+        if len(self.samples[operation]) < self.storage_sample:
+            self.samples[operation].append(tx)
+        return tx
+
+    def report(self):
+        transactions = sum(len(gas) for gas in self.gas.values()) + sum(self.reverted.values())
+        operations = {}
+        storage_slots = 0
+        for operation, gas in self.gas.items():
+            ordered = sorted(gas)
+            growth = [storage_growth(tx) for tx in self.samples[operation]]
+            slots = round(statistics.mean(growth) * len(gas)) if growth else 0
+            storage_slots += slots
+            operations[operation] = {
+                "calls": len(gas),
+                "reverted": self.reverted[operation],
+                "total": sum(gas),
+                "mean": round(statistics.mean(gas)),
+                "p50": percentile(ordered, 0.5),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+                "max": ordered[-1],
+                "storage_slots": slots,
+            }
+        return {
+            "transactions": transactions,
+            "seconds": round(self.seconds, 3),
+            "tps": round(transactions / self.seconds, 2) if self.seconds else 0,
+            "storage_slots": storage_slots,
+            "operations": operations,
+        }
+
+
+def storage_growth(tx):
+    """Net number of storage slots the transaction turned from zero to non-zero."""
+    slots = {(step["address"], int(step["stack"][-1], 16)) for step in tx.trace if step["op"] == "SSTORE"}
+    growth = 0
+    for address, slot in slots:
+        before = int.from_bytes(web3.eth.get_storage_at(address, slot, tx.block_number - 1), "big")
+        after = int.from_bytes(web3.eth.get_storage_at(address, slot, tx.block_number), "big")
+        growth += (after != 0) - (before != 0)
+    return growth
+
+
+class Simulation:
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.config = config = scenario["config"]
+        self.owner = accounts[0]
+        self.teachers = [self._account("teacher", i) for i in range(config["teachers"])]
+        self.students = [self._account("student", i) for i in range(config["students"])]
+        self.phases = {}
+        # student index - credits, the degrees are minted once
+        self.credits = [0] * config["students"]
+        self.graduated = set()
+
+    def run(self):
+        setup = self._phase("setup")
+        self._deploy(setup)
+        for semester_index in range(self.config["semesters"]):
+            self._semester(semester_index)
+        return {name: phase.report() for name, phase in self.phases.items()}
+
+    def _deploy(self, phase):
+        config = self.config
+        CourseHelper.deploy({'from': self.owner, 'silent': True})
+        implementations = (ZERO_ADDRESS,) * 5
+        if config["deployment"] == "clone":
+            implementations = [contract.address for contract in (
+                Person.deploy("Teacher", "tch", {'from': self.owner, 'silent': True}),
+                Student.deploy("Student", "std", {'from': self.owner, 'silent': True}),
+                CourseCatalog.deploy("CourseCatalog", "coc", ZERO_ADDRESS, ZERO_ADDRESS,
+                                     {'from': self.owner, 'silent': True}),
+                Degree.deploy("Degree", "deg", {'from': self.owner, 'silent': True}),
+                Semester.deploy("Semester", "sem", ZERO_ADDRESS, 0, {'from': self.owner, 'silent': True}),
+            )]
+        self.university = University.deploy(implementations, {'from': self.owner, 'silent': True})
+        self.course_catalog = Contract.from_abi("CourseCatalog", self.university.courseCatalog(), CourseCatalog.abi)
+
+        for account in self.teachers + self.students:
+            phase.record("fund", lambda: self.owner.transfer(account, FUNDING, silent=True))
+        for start in range(0, len(self.teachers), BATCH):
+            phase.send("createTeachers", self.university.createTeachers, self.teachers[start:start + BATCH],
+                       sender=self.owner)
+        for start in range(0, len(self.students), BATCH):
+            phase.send("createStudents", self.university.createStudents, self.students[start:start + BATCH],
+                       sender=self.owner)
+        # the course ids are the catalog token ids, minted in order
+        for teacher, credit in zip(self.scenario["course_teachers"], self.scenario["course_credits"]):
+            phase.send("mintCourse", self.course_catalog.mint, credit, sender=self.teachers[teacher])
+
+    def _semester(self, semester_index):
+        workload = self.scenario["semesters"][semester_index]
+        engine = ENGINES[self.config["engine"]]
+        courses = range(self.config["courses"])
+        university = self.university
+
+        phase = self._phase(f"{semester_index + 1}:planning")
+        phase.send("createNewSemester", university.createNewSemester, sender=self.owner)
+        semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+        for course in courses:
+            phase.send("addMyCourseNextSemester", university.addMyCourseNextSemester, course + 1,
+                       self.scenario["course_limits"][course], engine,
+                       sender=self.teachers[self.scenario["course_teachers"][course]])
+
+        phase = self._phase(f"{semester_index + 1}:applying")
+        phase.send("setNextState", university.setNextState, sender=self.owner)
+        # contended courses evict students or reject their applications
+        applications = defaultdict(list)
+        for student, choices in zip(workload["order"], workload["choices"]):
+            for course, _, _ in choices:
+                tx = phase.send("applyForCourse", university.applyForCourse, course + 1, student + 1,
+                                sender=self.students[student])
+                if tx is not None:
+                    applications[course].append((tx.events["ApplyForCourse"]["index"], student + 1))
+
+        phase = self._phase(f"{semester_index + 1}:trading")
+        phase.send("setNextState", university.setNextState, sender=self.owner)
+        if self.config["engine"] == "offChain":
+            self._allocate(phase, applications)
+        # student index - course - (claimed, mark)
+        plans = {student: {course: (claimed, mark) for course, claimed, mark in choices}
+                 for student, choices in zip(workload["order"], workload["choices"])}
+        tokens = defaultdict(list)
+        for course in courses:
+            _, student_ids, _ = semester.roster(course + 1, 0, self.scenario["course_limits"][course])
+            for student_id in student_ids:
+                student = student_id - 1
+                if not plans[student][course][0]:
+                    continue
+                tx = phase.send("claim", semester.claim, course + 1, student_id, sender=self.students[student])
+                if tx is not None:
+                    tokens[course].append((tx.events["ClaimCourse"]["tokenId"], student))
+
+        phase = self._phase(f"{semester_index + 1}:active")
+        phase.send("setNextState", university.setNextState, sender=self.owner)
+        for course, claimed in tokens.items():
+            marks = [plans[student][course][1] for _, student in claimed]
+            tx = phase.send("markStudents", university.markStudents, course + 1,
+                            [token_id for token_id, _ in claimed], marks,
+                            sender=self.teachers[self.scenario["course_teachers"][course]])
+            if tx is not None:
+                for _, student in claimed:
+                    self.credits[student] += self.scenario["course_credits"][course]
+
+        phase = self._phase(f"{semester_index + 1}:offSeason")
+        phase.send("setNextState", university.setNextState, sender=self.owner)
+        for student, credits in enumerate(self.credits):
+            if credits >= DEGREE_CREDITS and student not in self.graduated:
+                tx = phase.send("mintDegree", university.mintDegree, student + 1, sender=self.students[student])
+                if tx is not None:
+                    self.graduated.add(student)
+
+    def _allocate(self, phase, applications):
+        # the roster of an off-chain course is the top of its recorded applications, lowest first
+        for course in range(self.config["courses"]):
+            items = sorted(applications[course])
+            items = items[max(len(items) - self.scenario["course_limits"][course], 0):]
+            phase.send("allocateCourse", self.university.allocateCourse, course + 1,
+                       [student_id for _, student_id in items], [index for index, _ in items], sender=self.owner)
+
+    def _phase(self, name):
+        self.phases[name] = Phase(name, self.config["storage_sample"])
+        return self.phases[name]
+
+    def _account(self, role, index):
+        # the accounts are derived from the seed, so a replay uses the same addresses
+        return accounts.add(web3.keccak(text=f"{role}-{self.config['seed']}-{index}").hex())
+
+
+def load_config():
+    return {
+        "teachers": int(os.environ.get("SIM_TEACHERS", 10)),
+        "students": int(os.environ.get("SIM_STUDENTS", 200)),
+        "courses": int(os.environ.get("SIM_COURSES", 20)),
+        "semesters": int(os.environ.get("SIM_SEMESTERS", 3)),
+        "applications": int(os.environ.get("SIM_APPLICATIONS", 3)),
+        "capacity": float(os.environ.get("SIM_CAPACITY", 0.7)),
+        "zipf": float(os.environ.get("SIM_ZIPF", 1.0)),
+        "claim_rate": float(os.environ.get("SIM_CLAIM_RATE", 0.95)),
+        "engine": os.environ.get("SIM_ENGINE", "tree"),
+        "deployment": os.environ.get("SIM_DEPLOYMENT", "full"),
+        "seed": int(os.environ.get("SIM_SEED", 1238)),
+        "storage_sample": int(os.environ.get("SIM_STORAGE_SAMPLE", 2)),
+    }
+
+
+def main():
+    scenario_path = os.environ.get("SIM_SCENARIO", os.path.join("reports", "scenario.json"))
+    report_path = os.environ.get("SIM_REPORT", os.path.join("reports", "simulation.json"))
+    if os.path.exists(scenario_path):
+        with open(scenario_path) as scenario_file:
+            scenario = json.load(scenario_file)
+        print(f"Replaying {scenario_path}")
+    else:
+        scenario = generate(load_config())
+        os.makedirs(os.path.dirname(scenario_path) or ".", exist_ok=True)
+        with open(scenario_path, "w") as scenario_file:
+            json.dump(scenario, scenario_file)
+
+    phases = Simulation(scenario).run()
+    report = {
+        "config": scenario["config"],
+        "phases": phases,
+        "peak_storage_slots": max(phase["storage_slots"] for phase in phases.values()),
+        "storage_slots": sum(phase["storage_slots"] for phase in phases.values()),
+    }
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+
+    for name, phase in phases.items():
+        print(f"{name:<14} {phase['transactions']:>7} txs {phase['tps']:>9} tx/s {phase['storage_slots']:>8} slots")
+        for operation, gas in sorted(phase["operations"].items()):
+            print(f"    {operation:<24} {gas['calls']:>7} calls {gas['reverted']:>5} reverted "
+                  f"total {gas['total']:>12} p50 {gas['p50']:>8} p95 {gas['p95']:>8} p99 {gas['p99']:>8}")
+    print(f"Peak storage growth: {report['peak_storage_slots']} slots, report written to {report_path}")
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from brownie import accounts, web3
+from brownie import CourseCatalog, CourseHelper, Degree, Multicall, Person, Semester, Student, University
+from brownie.convert import to_address
+from brownie.network.contract import Contract
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from client import CallReverted, UniversityClient
+from deployment import deploy_university
+
+NUMBER_OF_STUDENTS = int(os.environ.get("CLIENT_BENCH_STUDENTS", 50))
+
+@pytest.fixture(scope="module")
+def throughput(request):
+    results = {}
+    yield results
+    report_path = os.path.join(os.path.dirname(request.config.getoption("--bench-report")) or ".",
+                               "client_throughput.json")
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as report_file:
+        json.dump(results, report_file, indent=2, sort_keys=True)
+
+@pytest.fixture(scope="function")
+def university():
+    accounts[0].deploy(CourseHelper)
+    return deploy_university()
+
+def connect(university, cache_size=32):
+    multicall = accounts[0].deploy(Multicall)
+    abis = {container._name: container.abi for container in
+            (University, Semester, Person, Student, CourseCatalog, Degree, Multicall)}
+    w3 = AsyncWeb3(AsyncHTTPProvider(web3.provider.endpoint_uri))
+    return UniversityClient(w3, university.address, multicall.address, accounts[0].address,
+                            abis=abis, cache_size=cache_size)
+
+def run(client, coroutine):
+    # every test runs its own event loop, the client connects in it
+    async def connected():
+        await client.connect()
+        return await coroutine()
+    return asyncio.run(connected())
+
+def new_semester(university):
+    university.createNewSemester({'from': accounts[0]})
+    for _ in range(5):
+        university.setNextState({'from': accounts[0]})
+
+def addresses(start, count):
+    return [to_address(f"0x{start + i:040x}") for i in range(count)]
+
+def record(throughput, scenario, naive, batched, count):
+    throughput[scenario] = {
+        "count": count,
+        "naive_per_second": round(count / naive, 2),
+        "client_per_second": round(count / batched, 2),
+        "speedup": round(naive / batched, 2),
+    }
+
+def test_connect(university):
+    client = connect(university)
+    run(client, lambda: asyncio.sleep(0))
+    assert client.student.address == university.student()
+    assert client.teacher.address == university.teacher()
+    assert client.course_catalog.address == university.courseCatalog()
+    assert client.degree.address == university.degree()
+    # the four registries are resolved in a single request
+    assert (client.multicall.batches, client.multicall.calls) == (1, 4)
+
+def test_semester_cache(university):
+    for _ in range(3):
+        new_semester(university)
+    client = connect(university, cache_size=2)
+
+    async def lookups():
+        first, again = await client.semester(1), await client.semester(1)
+        calls = client.multicall.calls
+        concurrent = await asyncio.gather(client.semester(2), client.semester(2))
+        assert client.multicall.calls == calls + 1
+        assert concurrent[0] is concurrent[1]
+        # the third semester evicts the least recently used first one
+        await client.semester(3)
+        evicted = await client.semester(1)
+        return first, again, evicted
+
+    first, again, evicted = run(client, lookups)
+    assert first is again
+    assert evicted is not first
+    assert evicted.address == first.address == university.semesters(1)
+
+def test_batched_reads(university, throughput):
+    university.createStudents(addresses(1, NUMBER_OF_STUDENTS), {'from': accounts[0]})
+    new_semester(university)
+    client = connect(university)
+    student_ids = list(range(1, NUMBER_OF_STUDENTS + 1))
+
+    # the naive pattern resolves the handle for every lookup and waits for every call
+    start = time.perf_counter()
+    expected = []
+    for student_id in student_ids:
+        student = Contract.from_abi("Student", university.student(), Student.abi)
+        expected.append(tuple(student.students(student_id)))
+    naive = time.perf_counter() - start
+
+    async def reads():
+        batches = client.multicall.batches
+        start = time.perf_counter()
+        values = await client.students(student_ids)
+        elapsed = time.perf_counter() - start
+        assert client.multicall.batches == batches + 1
+        semester = await client.semester(1)
+        # a reverting call fails alone, the rest of its batch is answered
+        with pytest.raises(CallReverted, match="There is no course with this id!"):
+            await asyncio.gather(client.call(semester.functions.roster(1, 0, 1)),
+                                 client.call(semester.functions.lastTokenId()))
+        return values, elapsed
+
+    values, batched = run(client, reads)
+    assert [tuple(value) for value in values] == expected
+    record(throughput, "students", naive, batched, NUMBER_OF_STUDENTS)
+
+def test_pipelined_onboarding(university, throughput):
+    client = connect(university)
+    start = time.perf_counter()
+    for address in addresses(1, NUMBER_OF_STUDENTS):
+        university.createStudent(address, {'from': accounts[0]})
+    naive = time.perf_counter() - start
+
+    async def onboarding():
+        start = time.perf_counter()
+        receipts = await client.create_students(addresses(NUMBER_OF_STUDENTS + 1, NUMBER_OF_STUDENTS))
+        return receipts, time.perf_counter() - start
+
+    receipts, pipelined = run(client, onboarding)
+    # the nonces follow each other without gaps
+    nonces = [web3.eth.get_transaction(receipt["transactionHash"])["nonce"] for receipt in receipts]
+    assert nonces == list(range(nonces[0], nonces[0] + NUMBER_OF_STUDENTS))
+    student = Contract.from_abi("Student", university.student(), Student.abi)
+    for address in addresses(1, 2 * NUMBER_OF_STUDENTS):
+        assert student.balanceOf(address) == 1
+    record(throughput, "createStudent", naive, pipelined, NUMBER_OF_STUDENTS)
+
+def test_seats(university):
+    university.createTeacher(accounts[1])
+    university.createStudent(accounts[2])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(4, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, 2, {'from': accounts[1]})
+    university.addMyCourseNextSemester(2, 2, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourses([1, 2], 1, {'from': accounts[2]})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(1), Semester.abi)
+    semester.claim(1, 1, {'from': accounts[2]})
+    client = connect(university)
+
+    async def seats():
+        return await client.seats(1, 1)
+
+    # the place of the second course is not claimed
+    assert run(client, seats) == [(1, 1, 0), (semester.seatTokenId(2, 1), 2, 0)]
@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+
+import pytest
+
+from gas_profile import GasProfiler
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-report", default=os.path.join("reports", "gas_benchmark.json"),
+                    help="Path of the machine-readable gas benchmark report.")
+    group.addoption("--bench-baseline", default=os.path.join("tests", "gas_baseline.json"),
+                    help="Path of the stored gas baseline the benchmarks are checked against.")
+    group.addoption("--bench-tolerance", default=0.01, type=float,
+                    help="Allowed relative gas increase over the baseline.")
+    group.addoption("--update-bench-baseline", action="store_true",
+                    help="Store the measured gas as the new baseline instead of checking it.")
+
+    group = parser.getgroup("gas profile")
+    group.addoption("--gas-profile", action="store_true",
+                    help="Record the gas of every transaction sent by the tests per contract and function.")
+    group.addoption("--gas-profile-report", default=os.path.join("reports", "gas_profile.json"),
+                    help="Path of the machine-readable gas profile.")
+    group.addoption("--gas-profile-baseline", default=os.path.join("tests", "gas_profile_baseline.json"),
+                    help="Path of the stored gas profile the functions are compared to.")
+    group.addoption("--gas-profile-top", default=5, type=int,
+                    help="Number of the most expensive transactions broken down by internal function.")
+    group.addoption("--gas-profile-trace", action="store_true",
+                    help="Trace every transaction to aggregate the gas of internal functions, slow.")
+    group.addoption("--update-gas-profile-baseline", action="store_true",
+                    help="Store the recorded gas profile as the new baseline.")
+
+
+def pytest_configure(config):
+    if config.getoption("--gas-profile"):
+        config.pluginmanager.register(GasProfiler(config), "gas_profile")
+
+
+class GasReport:
+    """Collects gas measurements per scenario and checks them against a stored baseline."""
+
+    def __init__(self, baseline, tolerance, update):
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.update = update
+        self.scenarios = {}
+
+    def record(self, scenario, gas_used, **extra):
+        gas_used = list(gas_used)
+        ordered = sorted(gas_used)
+        self.scenarios[scenario] = {
+            "calls": len(gas_used),
+            "total": sum(gas_used),
+            "mean": round(statistics.mean(gas_used)) if gas_used else 0,
+            "median": round(statistics.median(gas_used)) if gas_used else 0,
+            "p95": ordered[(len(ordered) - 1) * 95 // 100] if ordered else 0,
+            "max": ordered[-1] if ordered else 0,
+            "gas": gas_used,
+            **extra,
+        }
+        return self.scenarios[scenario]
+
+    def check(self, scenario):
+        """Fails the running test if `scenario` has no baseline or got more expensive than it."""
+        if self.update:
+            return
+        if scenario not in self.baseline:
+            pytest.fail(f"{scenario}: there is no stored gas baseline, store one with --update-bench-baseline")
+        current = self.scenarios[scenario]
+        for metric in ("mean", "max"):
+            limit = self.baseline[scenario][metric] * (1 + self.tolerance)
+            if current[metric] > limit:
+                pytest.fail(f"{scenario}: {metric} gas {current[metric]} exceeds the baseline "
+                            f"{self.baseline[scenario][metric]}")
+
+    def markdown(self):
+        """Table of the measured mean gas next to the baseline (the "before" of a change)."""
+        lines = ["| Scenario | Calls | Total | Baseline mean | Mean | Change | Max |",
+                 "|---|---:|---:|---:|---:|---:|---:|"]
+        for name, scenario in sorted(self.scenarios.items()):
+            before = self.baseline.get(name, {}).get("mean")
+            change = f"{(scenario['mean'] - before) / before:+.1%}" if before else ""
+            lines.append(f"| {name} | {scenario['calls']} | {scenario['total']} | "
+                         f"{before if before is not None else ''} | {scenario['mean']} | {change} | {scenario['max']} |")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        return {name: {key: value for key, value in scenario.items() if key != "gas"}
+                for name, scenario in self.scenarios.items()}
+
+
+@pytest.fixture(scope="session")
+def gas_report(request):
+    config = request.config
+    baseline_path = config.getoption("--bench-baseline")
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+    report = GasReport(baseline, config.getoption("--bench-tolerance"),
+                       config.getoption("--update-bench-baseline"))
+    yield report
+
+    if not report.scenarios:
+        return
+    report_path = config.getoption("--bench-report")
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as report_file:
+        json.dump({"scenarios": report.scenarios}, report_file, indent=2, sort_keys=True)
+    with open(os.path.splitext(report_path)[0] + ".md", "w") as markdown_file:
+        markdown_file.write(report.markdown())
+    if report.update:
+        with open(baseline_path, "w") as baseline_file:
+            json.dump({**baseline, **report.summary()}, baseline_file, indent=2, sort_keys=True)
@@ -1,15 +1,18 @@
 import pytest
 
 from brownie import accounts, reverts
-from brownie import CourseCatalog, University, CourseHelper
+from brownie import CourseCatalog, CourseHelper
+
+from deployment import deploy_university
 
 @pytest.fixture(scope="function")
 def fixture():
     accounts[0].deploy(CourseHelper)
-    university = accounts[0].deploy(University)
+    university = deploy_university()
     university.createTeacher(accounts[1])
     university.createTeacher(accounts[2])
-    course_catalog = accounts[0].deploy(CourseCatalog, "CourseCatalog", "coc", university.address)
+    course_catalog = accounts[0].deploy(CourseCatalog, "CourseCatalog", "coc", university.address,
+        university.teacher())
     return (university, course_catalog)
 
 def test_create_course(fixture):
@@ -27,6 +30,11 @@ def test_create_course(fixture):
     assert course_catalog.tokenURI(2) == "uri"
     assert course_catalog.creditValues(2) == 8
 
+def test_set_base_uri(fixture):
+    _, course_catalog = fixture
+    with reverts("Only the university can set the base URI!"):
+        course_catalog.setBaseURI("https://example.org/", {'from': accounts[0]})
+
 def test_only_off_season(fixture):
     university, course_catalog = fixture
     university.createNewSemester({'from': accounts[0]})
@@ -64,4 +72,11 @@ def test_only_owner_burn_course(fixture):
     _, course_catalog = fixture
     course_catalog.mint(5, {'from': accounts[1]})
     with reverts("Sender is not the owner!"):
-        course_catalog.burn(1, {'from': accounts[2]})
\ No newline at end of file
+        course_catalog.burn(1, {'from': accounts[2]})
+
+def test_course_of(fixture):
+    _, course_catalog = fixture
+    course_catalog.mint(5, {'from': accounts[1]})
+    assert course_catalog.courseOf(1) == (accounts[1], 5)
+    with reverts("Token is not minted"):
+        course_catalog.courseOf(2)
@@ -0,0 +1,168 @@
+"""Python reference models of the course structures, used to check the contracts' ordering."""
+import bisect
+import heapq
+
+# the course keys pack the index into the upper and the student id into the lower 128 bits
+STUDENT_MASK = 2 ** 128 - 1
+
+
+def pack(index, student):
+    return index << 128 | student
+
+
+class Revert(Exception):
+    """Raised when the modelled call is expected to revert with `reason` (None for a bare require)."""
+
+    def __init__(self, reason=None):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class OrderedListModel:
+    """Sorted set of keys with the semantics of the OrderedList library."""
+
+    def __init__(self):
+        self.keys = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        position = bisect.bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    def insert(self, key):
+        if key == 0 or key in self:
+            raise Revert()
+        bisect.insort(self.keys, key)
+
+    def remove(self, key):
+        if key == 0 or key not in self:
+            raise Revert()
+        self.keys.remove(key)
+
+    def first(self):
+        return self.keys[0] if self.keys else 0
+
+    def last(self):
+        return self.keys[-1] if self.keys else 0
+
+
+class CourseModel:
+    """Mirrors `Semester.applyForCourse` together with `CourseHelper.applyForCourse`."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        # packed index and student id keys
+        self.tree = OrderedListModel()
+        # student id - credit index
+        self.keys = {}
+
+    def index(self, score):
+        return (score + 1) * 1000 // 30 + self.limit - len(self.keys)
+
+    def apply(self, student, score):
+        """Applies `student` with `score`.
+
+        Returns the index the student got, the removed student id (or None) and
+        the tree operations performed, as a list of ("insert"/"remove", key).
+        Raises Revert if the contract would revert; the model is left untouched then.
+        """
+        index = self.index(score)
+        if student in self.keys:
+            raise Revert("Student has already applied for this course!")
+        if index <= 1:
+            raise Revert("Student has too low index!")
+
+        operations = []
+        removed = None
+        if self.limit <= len(self.keys):
+            first = self.tree.first()
+            if first >> 128 >= index:
+                raise Revert("The first index is too high to apply for this course!")
+            removed = first & STUDENT_MASK
+            self.tree.remove(first)
+            del self.keys[removed]
+            operations.append(("remove", first))
+        key = pack(index, student)
+        self.tree.insert(key)
+        self.keys[student] = index
+        operations.append(("insert", key))
+        return index, removed, operations
+
+    def roster(self):
+        """Student ids in the course ordered by their keys, lowest first."""
+        return [key & STUDENT_MASK for key in self.tree.keys]
+
+
+class HeapCourseModel:
+    """Mirrors `Semester.applyForCourse` for a course using the heap engine of `CourseHelper`."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        # (credit index, student id) items, the lowest is evicted first
+        self.heap = []
+        # student id - credit index
+        self.keys = {}
+
+    def index(self, score):
+        return (score + 1) * 1000 // 30 + self.limit - len(self.keys)
+
+    def apply(self, student, score):
+        """Same as `CourseModel.apply`; the heap engine performs no tree operations."""
+        index = self.index(score)
+        if student in self.keys:
+            raise Revert("Student has already applied for this course!")
+        if index <= 1:
+            raise Revert("Student has too low index!")
+
+        removed = None
+        if self.limit <= len(self.keys):
+            if self.heap[0][0] >= index:
+                raise Revert("The first index is too high to apply for this course!")
+            _, removed = heapq.heapreplace(self.heap, (index, student))
+            del self.keys[removed]
+        else:
+            heapq.heappush(self.heap, (index, student))
+        self.keys[student] = index
+        return index, removed, []
+
+    def roster(self):
+        """Student ids in the course ordered by their keys, lowest first."""
+        return [student for _, student in sorted(self.heap)]
+
+
+class OffChainCourseModel:
+    """Mirrors a course of `CourseHelper` using the off-chain engine.
+
+    Every application is recorded; the roster is computed by `allocate` and submitted once.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        # student id - credit index
+        self.keys = {}
+
+    def index(self, score):
+        # nobody has a place until the course is allocated
+        return (score + 1) * 1000 // 30 + self.limit
+
+    def apply(self, student, score):
+        """Same as `CourseModel.apply`; nobody is removed while applying."""
+        index = self.index(score)
+        if student in self.keys:
+            raise Revert("Student has already applied for this course!")
+        if index <= 1:
+            raise Revert("Student has too low index!")
+        self.keys[student] = index
+        return index, None, []
+
+    def allocate(self):
+        """The roster to submit as (student ids, indexes), lowest (index, student id) first."""
+        items = sorted((index, student) for student, index in self.keys.items())
+        items = items[max(len(items) - self.limit, 0):]
+        return [student for _, student in items], [index for index, _ in items]
+
+    def roster(self):
+        """Student ids in the course ordered by their keys, lowest first."""
+        return self.allocate()[0]
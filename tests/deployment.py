@@ -0,0 +1,26 @@
+"""Deployment helpers shared by the tests."""
+from brownie import ZERO_ADDRESS, accounts
+from brownie import CourseCatalog, Degree, Person, Semester, Student, University
+
+# full deployments of every contract or EIP-1167 clones of implementation contracts
+MODES = ["full", "clone"]
+
+NO_IMPLEMENTATIONS = (ZERO_ADDRESS,) * 5
+
+
+def deploy_implementations(account=None):
+    """Deploys one implementation of each cloned contract, in the order of `University.Implementations`."""
+    account = account or accounts[0]
+    return (
+        account.deploy(Person, "Teacher", "tch").address,
+        account.deploy(Student, "Student", "std").address,
+        account.deploy(CourseCatalog, "CourseCatalog", "coc", ZERO_ADDRESS, ZERO_ADDRESS).address,
+        account.deploy(Degree, "Degree", "deg").address,
+        account.deploy(Semester, "Semester", "sem", ZERO_ADDRESS, 0).address,
+    )
+
+
+def deploy_university(mode="full", account=None):
+    account = account or accounts[0]
+    implementations = NO_IMPLEMENTATIONS if mode == "full" else deploy_implementations(account)
+    return account.deploy(University, implementations)
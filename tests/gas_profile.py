@@ -0,0 +1,173 @@
+"""Pytest plugin recording the gas of every transaction sent by the tests.
+
+Enabled by `--gas-profile`, it is registered by conftest.py. The transactions are aggregated by
+contract and function, the most expensive ones are traced and broken down into the internal
+functions and storage writes which used their gas. With `--gas-profile-trace` every transaction
+is traced, so internal functions (for example `OrderedList.insert` inside `CourseHelper`) are
+aggregated across the whole run. The JSON and Markdown reports hold the change of every
+function against the saved baseline.
+"""
+import heapq
+import json
+import os
+import statistics
+
+from brownie import history
+
+# the opcodes which write storage
+STORAGE_WRITES = ("SSTORE",)
+
+
+def step_costs(trace):
+    """Gas used by every step of a brownie trace itself, the gas of the called frames excluded."""
+    # index of a call step - index of the first step after its frame returned
+    returns_to = {}
+    pending = []
+    for index in range(1, len(trace)):
+        depth = trace[index]["depth"]
+        if depth > trace[index - 1]["depth"]:
+            pending.append(index - 1)
+        while pending and depth <= trace[pending[-1]]["depth"]:
+            returns_to[pending.pop()] = index
+
+    costs = [0] * len(trace)
+    suffix = [0] * (len(trace) + 1)
+    for index in reversed(range(len(trace))):
+        step = trace[index]
+        if index in returns_to:
+            end = returns_to[index]
+            cost = step["gas"] - trace[end]["gas"] - (suffix[index + 1] - suffix[end])
+        elif index + 1 < len(trace) and trace[index + 1]["depth"] == step["depth"]:
+            cost = step["gas"] - trace[index + 1]["gas"]
+        elif index + 1 < len(trace):
+            # the last step of a frame or a call whose frame never returned, the caller's call is charged
+            cost = 0
+        else:
+            cost = step["gasCost"]
+        costs[index] = cost
+        suffix[index] = suffix[index + 1] + cost
+    return costs
+
+
+def breakdown(tx):
+    """Gas and storage writes of a transaction per internal function, most expensive first."""
+    functions = {}
+    for step, cost in zip(tx.trace, step_costs(tx.trace)):
+        name = step["fn"] or f"{step['contractName']}.<unknown>"
+        function = functions.setdefault(name, {"gas": 0, "storage_writes": 0, "storage_gas": 0})
+        function["gas"] += cost
+        if step["op"] in STORAGE_WRITES:
+            function["storage_writes"] += 1
+            function["storage_gas"] += cost
+    return dict(sorted(functions.items(), key=lambda item: -item[1]["gas"]))
+
+
+def summarize(gas_used):
+    return {
+        "calls": len(gas_used),
+        "total": sum(gas_used),
+        "mean": round(statistics.mean(gas_used)),
+        "max": max(gas_used),
+    }
+
+
+class GasProfiler:
+    def __init__(self, config):
+        self.report_path = config.getoption("--gas-profile-report")
+        self.baseline_path = config.getoption("--gas-profile-baseline")
+        self.update = config.getoption("--update-gas-profile-baseline")
+        self.trace_all = config.getoption("--gas-profile-trace")
+        self.top = config.getoption("--gas-profile-top")
+        # contract.function - gas used by each call
+        self.functions = {}
+        self.reverted = {}
+        # internal function - gas and storage writes summed over the traced transactions
+        self.internal = {}
+        # (gas used, txid, hotspot) of the most expensive transactions
+        self.hotspots = []
+        self._seen = set()
+
+    def pytest_runtest_teardown(self, item):
+        for tx in list(history):
+            if tx.txid in self._seen:
+                continue
+            self._seen.add(tx.txid)
+            self._record(tx, item.nodeid)
+
+    def pytest_sessionfinish(self, session):
+        if not self.functions:
+            return
+        baseline = {}
+        if os.path.exists(self.baseline_path):
+            with open(self.baseline_path) as baseline_file:
+                baseline = json.load(baseline_file)
+        functions = {name: summarize(gas_used) for name, gas_used in sorted(self.functions.items())}
+        for name, summary in functions.items():
+            summary["reverted"] = self.reverted.get(name, 0)
+            before = baseline.get(name, {}).get("mean")
+            summary["baseline_mean"] = before
+            summary["change"] = (summary["mean"] - before) / before if before else None
+        report = {
+            "functions": functions,
+            "internal": dict(sorted(self.internal.items(), key=lambda item: -item[1]["gas"])),
+            "hotspots": [hotspot for _, _, hotspot in sorted(self.hotspots, reverse=True)],
+        }
+        os.makedirs(os.path.dirname(self.report_path) or ".", exist_ok=True)
+        with open(self.report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        with open(os.path.splitext(self.report_path)[0] + ".md", "w") as markdown_file:
+            markdown_file.write(self.markdown(report))
+        if self.update:
+            with open(self.baseline_path, "w") as baseline_file:
+                json.dump({name: {key: summary[key] for key in ("calls", "total", "mean", "max")}
+                           for name, summary in functions.items()}, baseline_file, indent=2, sort_keys=True)
+
+    def markdown(self, report):
+        lines = ["## Gas by function", "",
+                 "| Function | Calls | Reverted | Total | Mean | Max | Baseline mean | Change |",
+                 "|---|---:|---:|---:|---:|---:|---:|---:|"]
+        for name, summary in sorted(report["functions"].items(), key=lambda item: -item[1]["total"]):
+            before = summary["baseline_mean"]
+            change = f"{summary['change']:+.1%}" if summary["change"] is not None else ""
+            lines.append(f"| {name} | {summary['calls']} | {summary['reverted']} | {summary['total']} | "
+                         f"{summary['mean']} | {summary['max']} | {before if before is not None else ''} | {change} |")
+        if report["internal"]:
+            lines += ["", "## Gas by internal function", "",
+                      "| Function | Gas | Storage writes | Storage gas |", "|---|---:|---:|---:|"]
+            for name, function in report["internal"].items():
+                lines.append(f"| {name} | {function['gas']} | {function['storage_writes']} | "
+                             f"{function['storage_gas']} |")
+        lines += ["", "## Most expensive transactions"]
+        for hotspot in report["hotspots"]:
+            lines += ["", f"### {hotspot['function']}: {hotspot['gas_used']} gas", "",
+                      f"`{hotspot['txid']}` in `{hotspot['test']}`", "",
+                      "| Internal function | Gas | Storage writes | Storage gas |", "|---|---:|---:|---:|"]
+            for name, function in list(hotspot["breakdown"].items())[:10]:
+                lines.append(f"| {name} | {function['gas']} | {function['storage_writes']} | "
+                             f"{function['storage_gas']} |")
+        return "\n".join(lines) + "\n"
+
+    def _record(self, tx, test):
+        name = f"{tx.contract_name or '<transfer>'}.{tx.fn_name or '<value>'}"
+        if tx.status == 0:
+            self.reverted[name] = self.reverted.get(name, 0) + 1
+            return
+        self.functions.setdefault(name, []).append(tx.gas_used)
+
+        is_hotspot = self.top > 0 and (len(self.hotspots) < self.top or tx.gas_used > self.hotspots[0][0])
+        if not (self.trace_all or is_hotspot):
+            return
+        # the trace is taken now, the chain may be reverted after the test
+        functions = breakdown(tx)
+        if self.trace_all:
+            for function_name, function in functions.items():
+                total = self.internal.setdefault(function_name, {"gas": 0, "storage_writes": 0, "storage_gas": 0})
+                for key, value in function.items():
+                    total[key] += value
+        if is_hotspot:
+            hotspot = {"function": name, "gas_used": tx.gas_used, "txid": tx.txid, "test": test,
+                       "breakdown": functions}
+            if len(self.hotspots) < self.top:
+                heapq.heappush(self.hotspots, (tx.gas_used, tx.txid, hotspot))
+            else:
+                heapq.heapreplace(self.hotspots, (tx.gas_used, tx.txid, hotspot))
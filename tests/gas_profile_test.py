@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from gas_profile import breakdown, step_costs
+
+def step(depth, gas, op="PUSH1", fn="Caller.run", gas_cost=3):
+    return {"depth": depth, "gas": gas, "gasCost": gas_cost, "op": op, "fn": fn, "contractName": fn.split(".")[0]}
+
+def test_nested_frame():
+    trace = [
+        step(0, 100),
+        step(0, 97, "CALL", gas_cost=60),
+        step(1, 50, fn="Callee.store"),
+        step(1, 47, "SSTORE", fn="Callee.store", gas_cost=20),
+        step(1, 27, "STOP", fn="Callee.store", gas_cost=0),
+        step(0, 70, "STOP", gas_cost=0),
+    ]
+    # the call is charged its own 27 gas less the 23 used by the called frame, not the forwarded gas
+    assert step_costs(trace) == [3, 4, 3, 20, 0, 0]
+    functions = breakdown(SimpleNamespace(trace=trace))
+    assert list(functions) == ["Callee.store", "Caller.run"]
+    assert functions["Callee.store"] == {"gas": 23, "storage_writes": 1, "storage_gas": 20}
+    assert functions["Caller.run"] == {"gas": 7, "storage_writes": 0, "storage_gas": 0}
+    assert sum(step_costs(trace)) == trace[0]["gas"] - trace[-1]["gas"]
+
+def test_frame_never_returns():
+    trace = [
+        step(0, 100),
+        step(0, 97, "CALL", gas_cost=60),
+        step(1, 40, fn="Callee.store"),
+        step(1, 37, "SSTORE", fn="Callee.store", gas_cost=20),
+    ]
+    # the call has no return step to measure it from, the steps of the frame are still counted
+    assert step_costs(trace) == [3, 0, 3, 20]
+    functions = breakdown(SimpleNamespace(trace=trace))
+    assert functions["Callee.store"] == {"gas": 23, "storage_writes": 1, "storage_gas": 20}
+    assert functions["Caller.run"]["gas"] == 3
@@ -0,0 +1,146 @@
+import pytest
+
+from brownie import accounts, chain
+from brownie import CourseCatalog, CourseHelper, Degree, Semester, Student, UniversityLens
+from brownie.network.contract import Contract
+
+from deployment import deploy_university
+from scripts.indexer import Indexer
+
+@pytest.fixture(scope="function")
+def university():
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    university.createTeacher(accounts[1])
+    university.createStudents(accounts[2:5])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(180, {'from': accounts[1]})
+    # the first semester gives credits and a mark to student 1
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, 3, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourse(1, 1, {'from': accounts[2]})
+    university.setNextState({'from': accounts[0]})
+    semester(university, 1).claim(1, 1, {'from': accounts[2]})
+    university.setNextState({'from': accounts[0]})
+    university.markStudent(1, 5, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    return university
+
+def semester(university, semester_id):
+    return Contract.from_abi("Semester", university.semesters(semester_id), Semester.abi)
+
+def second_semester(university):
+    university.mintDegree(1, {'from': accounts[2]})
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, 2, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourse(1, 2, {'from': accounts[3]})
+    university.applyForCourse(1, 3, {'from': accounts[4]})
+    # student 1 has a higher index, so the lowest of the full course is removed
+    tx = university.applyForCourse(1, 1, {'from': accounts[2]})
+    assert tx.events['RemoveForCourse']['studentId'] == 3
+
+def assert_mirrors(indexer, university):
+    lens = accounts[0].deploy(UniversityLens)
+    assert indexer.semester_states() == [(semester_id + 1, state) for semester_id, state in
+                                         enumerate(lens.semesterStates(university)[1])]
+    for semester_id in range(1, university.semesterId() + 1):
+        keys, student_ids, _ = semester(university, semester_id).roster(1, 0, 10)
+        assert indexer.roster(semester_id, 1) == list(zip(keys, student_ids))
+        for student_id in range(1, 4):
+            token_ids, course_ids, marks = lens.seatsOf(semester(university, semester_id), student_id)
+            assert indexer.seats_of(semester_id, student_id) == sorted(zip(token_ids, course_ids, marks))
+    student = Contract.from_abi("Student", university.student(), Student.abi)
+    for student_id in range(1, 4):
+        assert indexer.transcript(student_id) == tuple(student.students(student_id)[:2])
+
+def test_sync(university):
+    second_semester(university)
+    indexer = Indexer(university.address)
+    assert indexer.sync() == chain.height
+    assert indexer.last_block == chain.height
+    assert_mirrors(indexer, university)
+    assert indexer.evicted(2, 1) == [3]
+    assert indexer.evicted(1, 1) == []
+    degree = Contract.from_abi("Degree", university.degree(), Degree.abi)
+    assert indexer.db.execute("SELECT token_id, credit_value FROM degrees").fetchall() == [(1, degree.creditValues(1))]
+    assert indexer.db.execute("SELECT COUNT(*) FROM mints WHERE contract = 'student'").fetchone() == (3,)
+
+def test_resume(university, tmp_path):
+    database = str(tmp_path / "university.db")
+    indexer = Indexer(university.address, database)
+    indexer.sync()
+    assert_mirrors(indexer, university)
+    indexer.db.close()
+
+    second_semester(university)
+    # a restarted indexer continues from its checkpoint, in small block ranges
+    indexer = Indexer(university.address, database, batch_blocks=2)
+    checkpoint = indexer.last_block
+    assert checkpoint < chain.height
+    indexer.sync()
+    assert indexer.last_block == chain.height
+    assert_mirrors(indexer, university)
+    assert indexer.evicted(2, 1) == [3]
+    # nothing is indexed twice
+    assert indexer.db.execute("SELECT COUNT(*) FROM applications").fetchone() == (4,)
+    assert indexer.db.execute("SELECT COUNT(*) FROM marks").fetchone() == (1,)
+    indexer.sync()
+    assert indexer.db.execute("SELECT COUNT(*) FROM applications").fetchone() == (4,)
+
+def test_off_chain_roster(university):
+    university.createNewSemester({'from': accounts[0]})
+    # one place allocated off-chain
+    university.addMyCourseNextSemester(1, 1, 2, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    indexes = {}
+    for student_id in range(1, 4):
+        tx = university.applyForCourse(1, student_id, {'from': accounts[student_id + 1]})
+        indexes[student_id] = tx.events['ApplyForCourse']['index']
+    university.setNextState({'from': accounts[0]})
+    indexer = Indexer(university.address)
+    indexer.sync()
+    assert len(indexer.roster(2, 1)) == 3
+    # the applicants have no seats before the roster is allocated
+    assert indexer.seats_of(2, 1) == []
+    assert_mirrors(indexer, university)
+    index, student_id = max((index, student_id) for student_id, index in indexes.items())
+    tx = university.allocateCourse(1, [student_id], [index], {'from': accounts[0]})
+    assert tx.events['AllocateCourse']['cutoffStudentId'] == student_id
+    indexer.sync()
+    assert indexer.roster(2, 1) == [(index, student_id)]
+    assert indexer.seats_of(2, student_id) == [(1 << 128 | student_id, 1, 0)]
+    assert_mirrors(indexer, university)
+
+def test_unclaimed_seats(university):
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, 3, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourse(1, 2, {'from': accounts[3]})
+    indexer = Indexer(university.address)
+    indexer.sync()
+    # the places are not final while applying
+    assert indexer.seats_of(2, 2) == []
+    university.setNextState({'from': accounts[0]})
+    indexer.sync()
+    seat = semester(university, 2).seatTokenId(1, 2)
+    assert indexer.seats_of(2, 2) == [(seat, 1, 0)]
+    assert_mirrors(indexer, university)
+
+def test_derived_seats(university):
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, 3, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourse(1, 2, {'from': accounts[3]})
+    university.setNextState({'from': accounts[0]})
+    university.setNextState({'from': accounts[0]})
+    # the unclaimed seat is stored by its mark, its id does not fit into an SQLite INTEGER
+    seat = semester(university, 2).seatTokenId(1, 2)
+    assert seat >= 2 ** 128
+    university.markStudent(seat, 4, {'from': accounts[1]})
+    indexer = Indexer(university.address)
+    indexer.sync()
+    assert indexer.last_block == chain.height
+    assert indexer.seats_of(2, 2) == [(seat, 1, 4)]
+    assert_mirrors(indexer, university)
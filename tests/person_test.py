@@ -1,3 +1,5 @@
+import hashlib
+
 import pytest
 
 from brownie import accounts, reverts
@@ -14,6 +16,29 @@ def test_create_person(person):
     person.setTokenURI(1, "uri", {'from': accounts[1]})
     assert person.tokenURI(1) == "uri"
 
+def test_token_content_hash(person):
+    person.mint(accounts[1], {'from': accounts[0]})
+    digest = hashlib.sha256(b'{"name": "Person"}').hexdigest()
+    assert person.tokenContentHash(1) == 0
+    with reverts("ERC1238URIStorage: Sender address is not the owner of the token!"):
+        person.setTokenContentHash(1, "0x" + digest, {'from': accounts[2]})
+    with reverts("ERC1238URIStorage: The content hash is zero!"):
+        person.setTokenContentHash(1, 0, {'from': accounts[1]})
+    tx = person.setTokenContentHash(1, "0x" + digest, {'from': accounts[1]})
+    assert 'TokenURISet' in tx.events
+    assert person.tokenContentHash(1) == "0x" + digest
+    # the IPFS CIDv1 of the raw content without a base URI
+    assert person.tokenURI(1) == "ipfs://f01551220" + digest
+    with reverts("Ownable: caller is not the owner"):
+        person.setBaseURI("https://example.org/", {'from': accounts[1]})
+    person.setBaseURI("https://example.org/", {'from': accounts[0]})
+    assert person.baseURI() == "https://example.org/"
+    assert person.tokenURI(1) == "https://example.org/" + digest
+    # the string mode replaces the content hash
+    person.setTokenURI(1, "uri", {'from': accounts[1]})
+    assert person.tokenContentHash(1) == 0
+    assert person.tokenURI(1) == "uri"
+
 def test_addr_owns_only_one(person):
     person.mint(accounts[1], {'from': accounts[0]})
     with reverts("The address already owns a token!"):
@@ -25,4 +50,18 @@ def test_only_owner_mint(person):
 
 def test_only_owner_burn(person):
     with reverts("Ownable: caller is not the owner"):
-        person.burn(0, {'from': accounts[1]})
\ No newline at end of file
+        person.burn(0, {'from': accounts[1]})
+
+def test_mint_batch(person):
+    person.mint(accounts[1], {'from': accounts[0]})
+    person.mintBatch([accounts[2], accounts[3]], {'from': accounts[0]})
+    assert person.ownerOf(2) == accounts[2]
+    assert person.ownerOf(3) == accounts[3]
+    assert person.tokenOf(accounts[3]) == 3
+    assert person._tokenId() == 3
+    with reverts("The address already owns a token!"):
+        person.mintBatch([accounts[4], accounts[4]], {'from': accounts[0]})
+    with reverts("Ownable: caller is not the owner"):
+        person.mintBatch([accounts[4]], {'from': accounts[1]})
+    person.mint(accounts[4], {'from': accounts[0]})
+    assert person.tokenOf(accounts[4]) == 4
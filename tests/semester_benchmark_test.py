@@ -0,0 +1,167 @@
+import math
+import os
+import random
+
+import pytest
+
+from brownie import accounts, history, reverts
+from brownie import CourseHelper, OrderedListMock, Semester
+
+from course_model import CourseModel, HeapCourseModel, OffChainCourseModel, Revert
+from deployment import deploy_university
+
+SEED = 1238
+# the number of students of a course is stored in an uint16
+LIMIT_CEILING = 2 ** 16 - 1
+SIZES = [min(int(size), LIMIT_CEILING) for size in os.environ.get("GAS_BENCH_SIZES", "10,50,100,500").split(",")]
+PATTERNS = ["ascending", "descending", "random", "full_evict", "ties"]
+# CourseHelper.Engine
+TREE, HEAP, OFF_CHAIN = 0, 1, 2
+ENGINES = {"tree": (TREE, CourseModel), "heap": (HEAP, HeapCourseModel), "offChain": (OFF_CHAIN, OffChainCourseModel)}
+# a full allocation: every applicant of a contended course is placed or rejected
+APPLICANTS = int(os.environ.get("GAS_BENCH_APPLICANTS", 1000))
+ALLOCATION_LIMIT = 100
+
+
+def applications(pattern, size):
+    """Returns (student id, score) pairs sent to a course with `size` places."""
+    if pattern == "ascending":
+        scores = range(1, size + 1)
+    elif pattern == "descending":
+        scores = range(size, 0, -1)
+    elif pattern == "random":
+        scores = random.Random(SEED + size).sample(range(1, 10 * size + 1), size)
+    elif pattern == "ties":
+        # a few common scores for twice as many students as places
+        scores = [random.Random(SEED + size + student).choice((10, 20, 30)) for student in range(2 * size)]
+    else:
+        # fills the course, then every further student evicts the current minimum
+        scores = range(1, 2 * size + 1)
+    return list(enumerate(scores, start=1))
+
+
+@pytest.fixture(scope="module")
+def university():
+    accounts[0].deploy(CourseHelper)
+    return deploy_university()
+
+
+def open_course(university, size, engine=TREE):
+    semester = accounts[0].deploy(Semester, "Semester", "ses", university.address, 1)
+    semester.addNewCourse(1, size, engine, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    return semester
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_apply_for_course_gas(university, gas_report, pattern, size):
+    semester = open_course(university, size)
+    tree = accounts[0].deploy(OrderedListMock)
+    model = CourseModel(size)
+    gas = {"apply": [], "evict": [], "insert": [], "remove": []}
+
+    for student, score in applications(pattern, size):
+        try:
+            index, removed, operations = model.apply(student, score)
+        except Revert as revert:
+            with reverts(revert.reason):
+                semester.applyForCourse(1, student, score, {'from': accounts[0]})
+            continue
+        tx = semester.applyForCourse(1, student, score, {'from': accounts[0]})
+        # an application which removes a student is measured separately
+        gas["apply" if removed is None else "evict"].append(tx.gas_used)
+        assert tx.events['ApplyForCourse']['studentId'] == student
+        assert tx.events['ApplyForCourse']['index'] == index
+        if removed is None:
+            assert 'RemoveForCourse' not in tx.events
+        else:
+            assert tx.events['RemoveForCourse']['studentId'] == removed
+        # replays the same tree operations on the bare library
+        for operation, value in operations:
+            tx = getattr(tree, operation)(value, {'from': accounts[0]})
+            gas[operation].append(tx.gas_used)
+
+    keys = tree.keys()
+    assert list(keys) == model.tree.keys
+    depth = tree.depth()
+    # red-black tree height bound
+    assert depth <= 2 * math.log2(len(keys) + 1)
+
+    first_gas = [tree.first.estimate_gas()]
+    next_gas = [tree.next.estimate_gas(key) for key in keys[:-1]]
+
+    run = f"{pattern}-{size}"
+    scenarios = {
+        f"Semester.applyForCourse[{run}]": gas["apply"],
+        f"Semester.applyForCourse.evict[{run}]": gas["evict"],
+        f"OrderedList.insert[{run}]": gas["insert"],
+        f"OrderedList.remove[{run}]": gas["remove"],
+        f"OrderedList.first[{run}]": first_gas,
+        f"OrderedList.next[{run}]": next_gas,
+    }
+    for scenario, gas_used in scenarios.items():
+        if gas_used:
+            gas_report.record(scenario, gas_used, depth=depth, seats=len(keys))
+            gas_report.check(scenario)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_apply_for_course_heap_gas(university, gas_report, pattern, size):
+    semester = open_course(university, size, HEAP)
+    model = HeapCourseModel(size)
+    apply_gas = []
+
+    for student, score in applications(pattern, size):
+        try:
+            index, removed, _ = model.apply(student, score)
+        except Revert as revert:
+            with reverts(revert.reason):
+                semester.applyForCourse(1, student, score, {'from': accounts[0]})
+            continue
+        tx = semester.applyForCourse(1, student, score, {'from': accounts[0]})
+        apply_gas.append(tx.gas_used)
+        assert tx.events['ApplyForCourse']['index'] == index
+        if removed is None:
+            assert 'RemoveForCourse' not in tx.events
+        else:
+            assert tx.events['RemoveForCourse']['studentId'] == removed
+
+    scenario = f"Semester.applyForCourse.heap[{pattern}-{size}]"
+    gas_report.record(scenario, apply_gas, seats=len(model.keys))
+    gas_report.check(scenario)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_allocation_gas(university, gas_report, engine):
+    engine_id, Model = ENGINES[engine]
+    semester = open_course(university, ALLOCATION_LIMIT, engine_id)
+    model = Model(ALLOCATION_LIMIT)
+    apply_gas = []
+    reverted_gas = []
+
+    for student, score in applications("random", APPLICANTS):
+        try:
+            model.apply(student, score)
+        except Revert as revert:
+            with reverts(revert.reason):
+                semester.applyForCourse(1, student, score, {'from': accounts[0]})
+            # a rejected applicant still pays for the reverted transaction
+            assert history[-1].status == 0
+            reverted_gas.append(history[-1].gas_used)
+            continue
+        apply_gas.append(semester.applyForCourse(1, student, score, {'from': accounts[0]}).gas_used)
+    semester.setNextState({'from': accounts[0]})
+    allocate_gas = []
+    if engine_id == OFF_CHAIN:
+        student_ids, indexes = model.allocate()
+        allocate_gas.append(semester.allocate(1, student_ids, indexes, {'from': accounts[0]}).gas_used)
+    assert list(semester.roster(1, 0, ALLOCATION_LIMIT)[1]) == model.roster()
+
+    scenario = f"allocation.{engine}[{APPLICANTS}]"
+    # the total is the gas of the whole allocation, the rejected applications included
+    gas_report.record(scenario, apply_gas + reverted_gas + allocate_gas, applicants=APPLICANTS,
+                      seats=ALLOCATION_LIMIT, apply=sum(apply_gas), rejected=len(reverted_gas),
+                      rejected_gas=sum(reverted_gas), allocate=sum(allocate_gas))
+    gas_report.check(scenario)
@@ -1,13 +1,16 @@
 import pytest
 
 from brownie import accounts, reverts
-from brownie import Semester, University, CourseHelper, CourseCatalog
+from brownie import Semester, CourseHelper, CourseHelperMock, CourseCatalog
 from brownie.network.contract import Contract
 
+from course_model import CourseModel, OffChainCourseModel, Revert, pack
+from deployment import deploy_university
+
 @pytest.fixture(scope="function")
 def fixture():
     accounts[0].deploy(CourseHelper)
-    university = accounts[0].deploy(University)
+    university = deploy_university()
     university.createTeacher(accounts[1])
     university.createTeacher(accounts[2])
     university.createStudent(accounts[3])
@@ -188,5 +191,193 @@ def test_transfers(fixture):
     semester.transferFrom(accounts[3], accounts[0], 1, {'from': accounts[0]})
     assert semester.balanceOf(accounts[0]) == 1
     assert semester.balanceOf(accounts[3]) == 0
+    assert semester.tokensOf(1) == ()
+    # a seat given to a student without a place in the course is listed for the student
+    semester.transferFrom(accounts[0], accounts[4], 1, {'from': accounts[0]})
+    assert semester.tokensOf(2) == (1,)
+    assert semester.roster(1, 0, 10)[2] == (True,)
+    semester.setNextState({'from': accounts[0]})
+    trading_state_check()
+
+def test_tied_indexes(fixture):
+    _, semester = fixture
+    semester.addNewCourse(1, 4, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    model = CourseModel(4)
+    # four low scores fill the course, then six students share the same higher index
+    removed = []
+    for student, score in [(1, 0), (2, 0), (3, 0), (4, 0), (5, 29), (6, 29), (7, 29), (8, 29)]:
+        index, expected_removed, _ = model.apply(student, score)
+        tx = semester.applyForCourse(1, student, score, {'from': accounts[0]})
+        assert tx.events['ApplyForCourse']['index'] == index
+        if expected_removed is not None:
+            removed.append(tx.events['RemoveForCourse']['studentId'])
+    assert removed == [4, 3, 2, 1]
+    # a tie never collides, it only cannot remove a student with the same index
+    for student in (9, 10):
+        with pytest.raises(Revert):
+            model.apply(student, 29)
+        with reverts("The first index is too high to apply for this course!"):
+            semester.applyForCourse(1, student, 29, {'from': accounts[0]})
+    keys, student_ids, _ = semester.roster(1, 0, 10)
+    assert list(student_ids) == model.roster() == [5, 6, 7, 8]
+    assert len(set(keys)) == 1
+
+def test_course_walk(fixture):
+    course = accounts[0].deploy(CourseHelperMock, 3)
+    assert course.keys() == ()
+    # the fourth application removes the student with the lowest index
+    for student, index in [(1, 30), (2, 10), (3, 20), (4, 20)]:
+        course.applyForCourse(student, index, {'from': accounts[0]})
+    expected = [pack(20, 3), pack(20, 4), pack(30, 1)]
+    assert course.first() == expected[0]
+    assert course.next(course.first()) == expected[1]
+    assert course.next(expected[1]) == course.last() == expected[2]
+    assert list(course.keys()) == expected
+
+def test_heap_engine(fixture):
+    _, semester = fixture
+    # the same applications go to a tree (1) and a heap (2) course
+    semester.addNewCourse(1, 3, {'from': accounts[0]})
+    semester.addNewCourse(2, 3, 1, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    gas_used = {1: 0, 2: 0}
+    removed = {1: [], 2: []}
+    for student, index in [(1, 3), (2, 9), (3, 5), (4, 7), (5, 11), (6, 8)]:
+        for course in (1, 2):
+            tx = semester.applyForCourse(course, student, index, {'from': accounts[0]})
+            gas_used[course] += tx.gas_used
+            if 'RemoveForCourse' in tx.events:
+                removed[course].append(tx.events['RemoveForCourse']['studentId'])
+    assert removed[1] == removed[2] == [1, 3, 4]
+    assert gas_used[2] < gas_used[1]
+    for course in (1, 2):
+        with reverts("The first index is too high to apply for this course!"):
+            semester.applyForCourse(course, 7, 4, {'from': accounts[0]})
+        with reverts("Student has already applied for this course!"):
+            semester.applyForCourse(course, 2, 12, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    with reverts("You have no place in this course!"):
+        semester.claim(2, 1, {'from': accounts[3]})
+    semester.claim(2, 2, {'from': accounts[4]})
+    # the unclaimed place in the tree course is owned too
+    assert semester.balanceOf(accounts[4]) == 2
+
+def test_off_chain_engine(fixture):
+    _, semester = fixture
+    semester.addNewCourse(1, 2, {'from': accounts[0]})
+    semester.addNewCourse(2, 2, 2, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    model = OffChainCourseModel(2)
+    for student, index in [(1, 3), (2, 9), (3, 5)]:
+        tx = semester.applyForCourse(2, student, index, {'from': accounts[0]})
+        # every application is recorded, nobody is removed
+        assert tx.events['ApplyForCourse']['index'] == model.apply(student, index)[0]
+        assert 'RemoveForCourse' not in tx.events
+    with reverts("Student has already applied for this course!"):
+        semester.applyForCourse(2, 2, 12, {'from': accounts[0]})
+    student_ids, indexes = model.allocate()
+    assert student_ids == [3, 2]
+    with reverts("This is not the trading state!"):
+        semester.allocate(2, student_ids, indexes, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    with reverts("You have no place in this course!"):
+        semester.claim(2, 2, {'from': accounts[4]})
+    with reverts("Ownable: caller is not the owner"):
+        semester.allocate(2, student_ids, indexes, {'from': accounts[1]})
+    with reverts("The course is not allocated off-chain!"):
+        semester.allocate(1, [], [], {'from': accounts[0]})
+    with reverts("The number of students and indexes differ!"):
+        semester.allocate(2, student_ids, indexes[:1], {'from': accounts[0]})
+    with reverts("The roster does not fill the course!"):
+        semester.allocate(2, student_ids[1:], indexes[1:], {'from': accounts[0]})
+    with reverts("The roster is not sorted!"):
+        semester.allocate(2, student_ids[::-1], indexes[::-1], {'from': accounts[0]})
+    with reverts("The roster is not sorted!"):
+        semester.allocate(2, [2, 2], [indexes[1]] * 2, {'from': accounts[0]})
+    with reverts("The index does not match the application!"):
+        semester.allocate(2, student_ids, [indexes[0] + 1, indexes[1]], {'from': accounts[0]})
+    with reverts("A student with a higher index is left out!"):
+        semester.allocate(2, [1, 2], [model.keys[1], model.keys[2]], {'from': accounts[0]})
+    tx = semester.allocate(2, student_ids, indexes, {'from': accounts[0]})
+    event = tx.events['AllocateCourse']
+    assert (event['numberOfStudents'], event['cutoffIndex'], event['cutoffStudentId']) == (2, indexes[0], student_ids[0])
+    with reverts("The course is already allocated!"):
+        semester.allocate(2, student_ids, indexes, {'from': accounts[0]})
+    assert semester.roster(2, 0, 10) == (tuple(indexes), tuple(student_ids), (False, False))
+    with reverts("You have no place in this course!"):
+        semester.claim(2, 1, {'from': accounts[3]})
+    semester.claim(2, 2, {'from': accounts[4]})
+    semester.claim(2, 3, {'from': accounts[5]})
+    assert semester.roster(2, 1, 10) == ((indexes[1],), (2,), (True,))
+
+def test_mark_students(fixture):
+    _, semester = fixture
+    semester.addNewCourse(1, 10, {'from': accounts[0]})
+    semester.addNewCourse(2, 10, {'from': accounts[0]})
     semester.setNextState({'from': accounts[0]})
-    trading_state_check()
\ No newline at end of file
+    semester.applyForCourse(1, 1, 3, {'from': accounts[0]})
+    semester.applyForCourse(1, 2, 4, {'from': accounts[0]})
+    semester.applyForCourse(2, 3, 4, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    semester.claim(1, 1, {'from': accounts[3]})
+    semester.claim(1, 2, {'from': accounts[4]})
+    semester.claim(2, 3, {'from': accounts[5]})
+    with reverts("This is not the active state!"):
+        semester.markStudents(1, [1, 2], [5, 4], {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    with reverts("Ownable: caller is not the owner"):
+        semester.markStudents(1, [1, 2], [5, 4], {'from': accounts[1]})
+    with reverts("The number of tokens and marks differ!"):
+        semester.markStudents(1, [1, 2], [5], {'from': accounts[0]})
+    with reverts("This token is not exist!"):
+        semester.markStudents(1, [1, 4], [5, 4], {'from': accounts[0]})
+    with reverts("The token is not a place of this course!"):
+        semester.markStudents(1, [1, 3], [5, 4], {'from': accounts[0]})
+    tx = semester.markStudents(1, [1, 2], [5, 4], {'from': accounts[0]})
+    assert tx.return_value == (1, 2)
+    assert len(tx.events['StudentMarked']) == 2
+    assert semester.marks(1) == 5
+    assert semester.marks(2) == 4
+
+def test_derived_seats(fixture):
+    _, semester = fixture
+    semester.addNewCourse(1, 10, {'from': accounts[0]})
+    semester.addNewCourse(2, 1, 2, {'from': accounts[0]})
+    semester.setNextState({'from': accounts[0]})
+    semester.applyForCourse(1, 1, 3, {'from': accounts[0]})
+    semester.applyForCourse(1, 2, 4, {'from': accounts[0]})
+    index = semester.applyForCourse(2, 3, 5, {'from': accounts[0]}).events['ApplyForCourse']['index']
+    seat = semester.seatTokenId(1, 1)
+    # the places are not final while applying
+    with reverts("ERC721: owner query for nonexistent token"):
+        semester.ownerOf(seat)
+    assert semester.balanceOf(accounts[3]) == 0
+    semester.setNextState({'from': accounts[0]})
+    assert semester.ownerOf(seat) == accounts[3]
+    assert semester.balanceOf(accounts[3]) == 1
+    assert (semester.courseIds(seat), semester.studentIds(seat)) == (1, 1)
+    # an off-chain course has no seats until it is allocated
+    with reverts("ERC721: owner query for nonexistent token"):
+        semester.ownerOf(semester.seatTokenId(2, 3))
+    semester.allocate(2, [3], [index], {'from': accounts[0]})
+    assert semester.ownerOf(semester.seatTokenId(2, 3)) == accounts[5]
+    # a claimed seat is only owned through the minted token
+    semester.claim(1, 2, {'from': accounts[4]})
+    assert semester.balanceOf(accounts[4]) == 1
+    with reverts("ERC721: owner query for nonexistent token"):
+        semester.ownerOf(semester.seatTokenId(1, 2))
+    # the seat is written to storage by its first use
+    tx = semester.approve(accounts[0], seat, {'from': accounts[3]})
+    assert tx.events['ClaimCourse']['tokenId'] == seat
+    semester.transferFrom(accounts[3], accounts[0], seat, {'from': accounts[0]})
+    assert semester.ownerOf(seat) == accounts[0]
+    assert semester.balanceOf(accounts[3]) == 0
+    with reverts("You have already claimed this course!"):
+        semester.claim(1, 1, {'from': accounts[3]})
+    semester.setNextState({'from': accounts[0]})
+    tx = semester.markStudent(semester.seatTokenId(2, 3), 4, {'from': accounts[0]})
+    assert tx.events['ClaimCourse']['studentId'] == 3
+    assert tx.return_value == (2, 3)
+    assert semester.marks(semester.seatTokenId(2, 3)) == 4
+    assert semester.balanceOf(accounts[5]) == 1
@@ -32,4 +32,38 @@ def test_add_mark(student):
     with reverts("Ownable: caller is not the owner"):
         student.addMark(5, 10, 1, {'from': accounts[1]})
     with reverts("There is no student with this id!"):
-        student.addMark(5, 10, 1, {'from': accounts[0]})
\ No newline at end of file
+        student.addMark(5, 10, 1, {'from': accounts[0]})
+
+def test_mint_batch(student):
+    student.mintBatch([accounts[1], accounts[2]], {'from': accounts[0]})
+    assert student.students(2)[2]
+    student.addMark(5, 10, 2, {'from': accounts[0]})
+    assert student.students(2)[0] == 10
+
+def test_transcript_checkpoints(student):
+    student.mintBatch([accounts[1], accounts[2]], {'from': accounts[0]})
+    with reverts("There is no student with this id!"):
+        student.transcriptAt(3, 0)
+    student.addMark(5, 10, 1, {'from': accounts[0]})
+    with reverts("The semester is not closed yet!"):
+        student.transcriptAt(1, 1)
+    with reverts("Ownable: caller is not the owner"):
+        student.closeSemester(1, {'from': accounts[1]})
+    student.closeSemester(1, {'from': accounts[0]})
+    student.addMark(4, 11, 1, {'from': accounts[0]})
+    student.closeSemester(2, {'from': accounts[0]})
+    with reverts("The semester is already closed!"):
+        student.closeSemester(2, {'from': accounts[0]})
+    # nobody is marked in the third semester
+    student.closeSemester(3, {'from': accounts[0]})
+    student.addMark(3, 6, 1, {'from': accounts[0]})
+    assert student.transcriptAt(1, 0) == (0, 0)
+    assert student.transcriptAt(1, 1) == (10, 5)
+    assert student.transcriptAt(1, 2) == (21, 9)
+    assert student.transcriptAt(1, 3) == (21, 9)
+    assert student.transcriptAt(2, 3) == (0, 0)
+    with reverts("The semester is not closed yet!"):
+        student.transcriptAt(1, 4)
+    student.closeSemester(4, {'from': accounts[0]})
+    assert student.transcriptAt(1, 4) == (27, 12)
+    assert student.students(1)[3] == 4
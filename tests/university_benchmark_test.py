@@ -0,0 +1,205 @@
+import hashlib
+
+import pytest
+
+from brownie import accounts
+from brownie import CourseCatalog, CourseHelper, Person, Semester, University
+from brownie.convert import to_address
+from brownie.network.contract import Contract
+
+from deployment import NO_IMPLEMENTATIONS, deploy_implementations, deploy_university
+
+NUMBER_OF_COURSES = 8
+
+
+@pytest.fixture(scope="function")
+def applying_university():
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    university.createTeacher(accounts[1])
+    university.createStudent(accounts[2])
+    university.createStudent(accounts[3])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    for _ in range(NUMBER_OF_COURSES):
+        course_catalog.mint(5, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    for course_id in range(1, NUMBER_OF_COURSES + 1):
+        university.addMyCourseNextSemester(course_id, 10, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    return university
+
+
+def test_apply_for_courses_gas(applying_university, gas_report):
+    university = applying_university
+    course_ids = list(range(1, NUMBER_OF_COURSES + 1))
+    single = [university.applyForCourse(course_id, 1, {'from': accounts[2]}).gas_used for course_id in course_ids]
+    tx = university.applyForCourses(course_ids, 2, {'from': accounts[3]})
+    assert len(tx.events['ApplyForCourse']) == NUMBER_OF_COURSES
+    batch = [tx.gas_used // NUMBER_OF_COURSES] * NUMBER_OF_COURSES
+
+    gas_report.record("University.applyForCourse[per enrolment]", single)
+    gas_report.record("University.applyForCourses[per enrolment]", batch, batch_size=NUMBER_OF_COURSES)
+    assert sum(batch) < sum(single)
+    gas_report.check("University.applyForCourse[per enrolment]")
+    gas_report.check("University.applyForCourses[per enrolment]")
+
+
+def test_clone_deployment_gas(gas_report):
+    accounts[0].deploy(CourseHelper)
+    implementations = {"full": NO_IMPLEMENTATIONS, "clone": deploy_implementations()}
+    gas_used = {}
+    for mode in ("full", "clone"):
+        university = accounts[0].deploy(University, implementations[mode])
+        tx = university.createNewSemester({'from': accounts[0]})
+        gas_used[mode] = (university.tx.gas_used, tx.gas_used)
+        gas_report.record(f"University.deploy[{mode}]", [university.tx.gas_used])
+        gas_report.record(f"University.createNewSemester[{mode}]", [tx.gas_used])
+    assert gas_used["clone"][0] < gas_used["full"][0]
+    assert gas_used["clone"][1] < gas_used["full"][1]
+    for mode in ("full", "clone"):
+        gas_report.check(f"University.deploy[{mode}]")
+        gas_report.check(f"University.createNewSemester[{mode}]")
+
+
+def test_seat_and_degree_gas(gas_report):
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    university.createTeacher(accounts[1])
+    students = accounts[2:7]
+    for account in students:
+        university.createStudent(account)
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    mint_gas = [course_catalog.mint(180, {'from': accounts[1]}).gas_used]
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, len(students), {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    for student_id, account in enumerate(students, start=1):
+        university.applyForCourse(1, student_id, {'from': account})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    gas_used = {"CourseCatalog.mint": mint_gas, "Semester.claim": [], "University.markStudent": [],
+                "University.mintDegree": [], "University.setHashDegree": []}
+    for student_id, account in enumerate(students, start=1):
+        gas_used["Semester.claim"].append(semester.claim(1, student_id, {'from': account}).gas_used)
+    university.setNextState({'from': accounts[0]})
+    for token_id in range(1, len(students) + 1):
+        gas_used["University.markStudent"].append(university.markStudent(token_id, 5, {'from': accounts[1]}).gas_used)
+    university.setNextState({'from': accounts[0]})
+    for student_id, account in enumerate(students, start=1):
+        gas_used["University.mintDegree"].append(university.mintDegree(student_id, {'from': account}).gas_used)
+        gas_used["University.setHashDegree"].append(
+            university.setHashDegree(student_id, 12345, {'from': accounts[0]}).gas_used)
+    for scenario, values in gas_used.items():
+        gas_report.record(scenario, values)
+        gas_report.check(scenario)
+
+
+def test_derived_seat_gas(gas_report):
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    university.createTeacher(accounts[1])
+    students = accounts[2:10]
+    university.createStudents(students, {'from': accounts[0]})
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(5, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, len(students), {'from': accounts[1]})
+    university.addMyCourseNextSemester(2, len(students), {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    for student_id, account in enumerate(students, start=1):
+        university.applyForCourses([1, 2], student_id, {'from': account})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    # the places of the first course are claimed, the ones of the second are derived
+    claim_gas = {}
+    for student_id, account in enumerate(students, start=1):
+        tx = semester.claim(1, student_id, {'from': account})
+        claim_gas[tx.events['ClaimCourse']['tokenId']] = tx.gas_used
+    university.setNextState({'from': accounts[0]})
+
+    claimed = [claim_gas[token_id] + university.markStudent(token_id, 4, {'from': accounts[1]}).gas_used
+               for token_id in claim_gas]
+    derived = [university.markStudent(semester.seatTokenId(2, student_id), 4, {'from': accounts[1]}).gas_used
+               for student_id in range(1, len(students) + 1)]
+
+    gas_report.record("Semester.claim+University.markStudent[per seat]", claimed)
+    gas_report.record("University.markStudent[per derived seat]", derived)
+    assert sum(derived) < sum(claimed)
+    gas_report.check("Semester.claim+University.markStudent[per seat]")
+    gas_report.check("University.markStudent[per derived seat]")
+
+
+@pytest.mark.parametrize("batch_size", [1, 50, 200])
+def test_create_students_gas(gas_report, batch_size):
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    addresses = [to_address(f"0x{0x1000 + index:040x}") for index in range(2 * batch_size)]
+    single = [university.createStudent(address, {'from': accounts[0]}).gas_used for address in addresses[:batch_size]]
+    tx = university.createStudents(addresses[batch_size:], {'from': accounts[0]})
+    batch = [tx.gas_used // batch_size] * batch_size
+
+    gas_report.record(f"University.createStudent[{batch_size}]", single)
+    gas_report.record(f"University.createStudents[{batch_size}]", batch, batch_size=batch_size)
+    if batch_size > 1:
+        assert sum(batch) < sum(single)
+    gas_report.check(f"University.createStudent[{batch_size}]")
+    gas_report.check(f"University.createStudents[{batch_size}]")
+
+
+def test_mark_students_gas(gas_report):
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    university.createTeacher(accounts[1])
+    students = accounts[2:10]
+    university.createStudents(students, {'from': accounts[0]})
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(5, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, len(students), {'from': accounts[1]})
+    university.addMyCourseNextSemester(2, len(students), {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    for student_id, account in enumerate(students, start=1):
+        university.applyForCourses([1, 2], student_id, {'from': account})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    token_ids = {1: [], 2: []}
+    for student_id, account in enumerate(students, start=1):
+        for course_id in (1, 2):
+            tx = semester.claim(course_id, student_id, {'from': account})
+            token_ids[course_id].append(tx.events['ClaimCourse']['tokenId'])
+    university.setNextState({'from': accounts[0]})
+
+    single = [university.markStudent(token_id, 4, {'from': accounts[1]}).gas_used for token_id in token_ids[1]]
+    tx = university.markStudents(2, token_ids[2], [4] * len(students), {'from': accounts[1]})
+    batch = [tx.gas_used // len(students)] * len(students)
+
+    gas_report.record("University.markStudent[per mark]", single)
+    gas_report.record("University.markStudents[per mark]", batch, batch_size=len(students))
+    assert sum(batch) < sum(single)
+    gas_report.check("University.markStudent[per mark]")
+    gas_report.check("University.markStudents[per mark]")
+
+
+def test_token_uri_gas(gas_report):
+    person = accounts[0].deploy(Person, "Person", "pes")
+    person.mint(accounts[1], {'from': accounts[0]})
+    person.mint(accounts[2], {'from': accounts[0]})
+    # a typical 60-byte URI, an IPFS gateway link of a CIDv0
+    uris = [f"https://ipfs.io/ipfs/Qm{version}" + "x" * 36 for version in ("a", "b")]
+    assert all(len(uri) == 60 for uri in uris)
+    digests = ["0x" + hashlib.sha256(uri.encode()).hexdigest() for uri in uris]
+    gas_used = {
+        "ERC1238.setTokenURI[60 bytes]": [person.setTokenURI(1, uri, {'from': accounts[1]}).gas_used
+                                          for uri in uris],
+        "ERC1238.setTokenContentHash": [person.setTokenContentHash(2, digest, {'from': accounts[2]}).gas_used
+                                        for digest in digests],
+    }
+    # the first call writes new slots, the second updates them
+    for first, update in gas_used.values():
+        assert update < first
+    assert sum(gas_used["ERC1238.setTokenContentHash"]) < sum(gas_used["ERC1238.setTokenURI[60 bytes]"])
+    for scenario, values in gas_used.items():
+        gas_report.record(scenario, values, first=values[0], update=values[1])
+        gas_report.check(scenario)
@@ -0,0 +1,91 @@
+import pytest
+
+from brownie import accounts, reverts
+from brownie import CourseCatalog, CourseHelper, Semester, UniversityLens
+from brownie.network.contract import Contract
+
+from deployment import deploy_university
+
+@pytest.fixture(scope="function")
+def fixture():
+    accounts[0].deploy(CourseHelper)
+    university = deploy_university()
+    lens = accounts[0].deploy(UniversityLens)
+    university.createTeacher(accounts[1])
+    university.createStudents(accounts[2:6])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(4, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    # course 1 is ordered by a tree, course 2 by a heap
+    university.addMyCourseNextSemester(1, 3, {'from': accounts[1]})
+    university.addMyCourseNextSemester(2, 3, 1, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    # the current index of every student, rebuilt from the events
+    indexes = {1: {}, 2: {}}
+    for student_id in range(1, 4):
+        tx = university.applyForCourses([1, 2], student_id, {'from': accounts[student_id + 1]})
+        for event in tx.events['ApplyForCourse']:
+            indexes[event['courseId']][event['studentId']] = event['index']
+    university.setNextState({'from': accounts[0]})
+    for student_id in indexes[1]:
+        semester.claim(1, student_id, {'from': accounts[student_id + 1]})
+    for student_id in list(indexes[2])[:2]:
+        semester.claim(2, student_id, {'from': accounts[student_id + 1]})
+    university.setNextState({'from': accounts[0]})
+    university.markStudent(1, 5, {'from': accounts[1]})
+    university.markStudent(4, 3, {'from': accounts[1]})
+    return university, semester, lens, indexes
+
+def test_roster(fixture):
+    _, semester, _, indexes = fixture
+    for course_id in (1, 2):
+        expected = sorted((index, student_id) for student_id, index in indexes[course_id].items())
+        keys, student_ids, claimed = semester.roster(course_id, 0, 10)
+        assert list(zip(keys, student_ids)) == expected
+        for student_id, is_claimed in zip(student_ids, claimed):
+            claimed_tokens = [token_id for token_id in range(1, semester.lastTokenId() + 1)
+                              if semester.studentIds(token_id) == student_id and
+                              semester.courseIds(token_id) == course_id]
+            assert is_claimed == bool(claimed_tokens)
+        # pagination
+        assert semester.roster(course_id, 1, 1)[1] == (expected[1][1],)
+        assert semester.roster(course_id, 2, 5)[1] == (expected[2][1],)
+        assert semester.roster(course_id, 3, 5) == ((), (), ())
+    with reverts("There is no course with this id!"):
+        semester.roster(3, 0, 10)
+
+def test_seats_of(fixture):
+    university, semester, lens, indexes = fixture
+    # the last student of the heap course did not claim its place
+    unclaimed = list(indexes[2])[2]
+    for student_id in range(1, 5):
+        token_ids, course_ids, marks = lens.seatsOf(semester, student_id)
+        expected = [token_id for token_id in range(1, semester.lastTokenId() + 1)
+                    if semester.studentIds(token_id) == student_id]
+        if student_id == unclaimed:
+            expected.append(semester.seatTokenId(2, student_id))
+        assert list(token_ids) == expected
+        assert list(course_ids) == [semester.courseIds(token_id) for token_id in expected]
+        assert list(marks) == [semester.marks(token_id) for token_id in expected]
+        for token_id in expected:
+            assert semester.ownerOf(token_id) == accounts[student_id + 1]
+    # the seat is listed once after it is stored by its mark
+    seat = semester.seatTokenId(2, unclaimed)
+    university.markStudent(seat, 2, {'from': accounts[1]})
+    assert lens.seatsOf(semester, unclaimed)[0][-1] == seat
+    assert list(lens.seatsOf(semester, unclaimed)[0]).count(seat) == 1
+    assert lens.seatsOf(semester, unclaimed)[2][-1] == 2
+
+def test_semester_states(fixture):
+    university, _, lens, _ = fixture
+    university.setNextState({'from': accounts[0]})
+    university.createNewSemester({'from': accounts[0]})
+    semesters, states = lens.semesterStates(university)
+    assert len(semesters) == university.semesterId() == 2
+    for semester_id, (address, state) in enumerate(zip(semesters, states), start=1):
+        assert address == university.semesters(semester_id)
+        semester = Contract.from_abi("Semester", address, Semester.abi)
+        assert state == semester.currentState()
+    assert list(states) == [0, 1]
@@ -1,12 +1,18 @@
 import pytest
 
 from brownie import accounts, reverts
-from brownie import University, CourseCatalog, Person, Semester, Student, Degree
+from brownie import CourseCatalog, Person, Semester, Student, Degree
 from brownie.network.contract import Contract
 from brownie.convert import to_address
 
-def test_create_teacher():
-    university = accounts[0].deploy(University)
+from deployment import MODES, deploy_university
+
+@pytest.fixture(params=MODES)
+def mode(request):
+    return request.param
+
+def test_create_teacher(mode):
+    university = deploy_university(mode)
     university.createTeacher(accounts[1], {'from': accounts[0]})
     with reverts("The address already owns a token!"):
         university.createTeacher(accounts[1], {'from': accounts[0]})
@@ -18,8 +24,8 @@ def test_create_teacher():
     with reverts("This is not the off season state!"):
         university.createTeacher(accounts[2], {'from': accounts[0]})
 
-def test_create_student():
-    university = accounts[0].deploy(University)
+def test_create_student(mode):
+    university = deploy_university(mode)
     university.createStudent(accounts[1], {'from': accounts[0]})
     with reverts("The address already owns a token!"):
         university.createStudent(accounts[1], {'from': accounts[0]})
@@ -31,8 +37,8 @@ def test_create_student():
     with reverts("This is not the off season state!"):
         university.createStudent(accounts[2], {'from': accounts[0]})
 
-def test_create_new_semester():
-    university = accounts[0].deploy(University)
+def test_create_new_semester(mode):
+    university = deploy_university(mode)
     assert university.semesterId() == 0
     assert university.currentState() == 0
     university.createNewSemester({'from': accounts[0]})
@@ -42,8 +48,8 @@ def test_create_new_semester():
     assert semester.currentState() == 1
     assert semester.semesterId() == 1
 
-def test_set_next_state():
-    university = accounts[0].deploy(University)
+def test_set_next_state(mode):
+    university = deploy_university(mode)
     university.createNewSemester({'from': accounts[0]})
     semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
     for state in range(2, 5):
@@ -60,8 +66,8 @@ def test_set_next_state():
     university.setNextState({'from': accounts[0]})
     assert university.currentState() == 2
 
-def test_add_my_course_next_semester():
-    university = accounts[0].deploy(University)
+def test_add_my_course_next_semester(mode):
+    university = deploy_university(mode)
     university.createTeacher(accounts[1])
     course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
     course_catalog.mint(5, {'from': accounts[1]})
@@ -76,8 +82,8 @@ def test_add_my_course_next_semester():
     with reverts("This is not the planning state!"):
         university.addMyCourseNextSemester(1, 2, {'from': accounts[1]})
 
-def test_apply_for_course():
-    university = accounts[0].deploy(University)
+def test_apply_for_course(mode):
+    university = deploy_university(mode)
     university.createTeacher(accounts[1])
     university.createStudent(accounts[2])
     university.createStudent(accounts[3])
@@ -98,8 +104,8 @@ def test_apply_for_course():
     semester.claim(1, 1, {'from': accounts[2]})
     assert semester.balanceOf(accounts[2]) == 1
 
-def test_mint_degree():
-    university = accounts[0].deploy(University)
+def test_mint_degree(mode):
+    university = deploy_university(mode)
     university.createTeacher(accounts[1])
     university.createStudent(accounts[2])
     university.createStudent(accounts[3])
@@ -125,3 +131,166 @@ def test_mint_degree():
     assert degree.ownerOf(1) == accounts[2]
     assert degree.balanceOf(accounts[2]) == 1
     assert degree.hashValues(1) == 12345
+
+def test_apply_for_courses(mode):
+    university = deploy_university(mode)
+    university.createTeacher(accounts[1])
+    university.createStudent(accounts[2])
+    university.createStudent(accounts[3])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(4, {'from': accounts[1]})
+    course_catalog.mint(3, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    for course_id in range(1, 4):
+        university.addMyCourseNextSemester(course_id, 2, {'from': accounts[1]})
+    with reverts("This is not the applying state!"):
+        university.applyForCourses([1, 2], 1, {'from': accounts[2]})
+    university.setNextState({'from': accounts[0]})
+    with reverts("You must be a student!"):
+        university.applyForCourses([1, 2], 1, {'from': accounts[0]})
+    with reverts("You are not the owner this id!"):
+        university.applyForCourses([1, 2], 1, {'from': accounts[3]})
+    with reverts("There is no course with given id!"):
+        university.applyForCourses([1, 4], 1, {'from': accounts[2]})
+    tx = university.applyForCourses([1, 3], 1, {'from': accounts[2]})
+    assert [event['courseId'] for event in tx.events['ApplyForCourse']] == [1, 3]
+    with reverts("Student has already applied for this course!"):
+        university.applyForCourses([2, 3], 1, {'from': accounts[2]})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    semester.claim(1, 1, {'from': accounts[2]})
+    semester.claim(3, 1, {'from': accounts[2]})
+    with reverts("You have no place in this course!"):
+        semester.claim(2, 1, {'from': accounts[2]})
+    assert semester.balanceOf(accounts[2]) == 2
+
+def test_allocate_course(mode):
+    university = deploy_university(mode)
+    university.createTeacher(accounts[1])
+    university.createStudents([accounts[2], accounts[3]])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    # a course with one place allocated off-chain
+    university.addMyCourseNextSemester(1, 1, 2, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    index = university.applyForCourse(1, 1, {'from': accounts[2]}).events['ApplyForCourse']['index']
+    university.applyForCourse(1, 2, {'from': accounts[3]})
+    with reverts("This is not the trading state!"):
+        university.allocateCourse(1, [2], [index], {'from': accounts[0]})
+    university.setNextState({'from': accounts[0]})
+    with reverts("Ownable: caller is not the owner"):
+        university.allocateCourse(1, [2], [index], {'from': accounts[1]})
+    # the equal indexes are ordered by the student ids
+    with reverts("A student with a higher index is left out!"):
+        university.allocateCourse(1, [1], [index], {'from': accounts[0]})
+    university.allocateCourse(1, [2], [index], {'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    with reverts("You have no place in this course!"):
+        semester.claim(1, 1, {'from': accounts[2]})
+    semester.claim(1, 2, {'from': accounts[3]})
+    assert semester.balanceOf(accounts[3]) == 1
+
+def test_transcript_checkpoints(mode):
+    university = deploy_university(mode)
+    university.createTeacher(accounts[1])
+    university.createStudents([accounts[2], accounts[3]])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(4, {'from': accounts[1]})
+    student = Contract.from_abi("Student", university.student(), Student.abi)
+    for course_id, mark in ((1, 5), (2, 3)):
+        university.createNewSemester({'from': accounts[0]})
+        university.addMyCourseNextSemester(course_id, 2, {'from': accounts[1]})
+        university.setNextState({'from': accounts[0]})
+        university.applyForCourse(course_id, 1, {'from': accounts[2]})
+        university.setNextState({'from': accounts[0]})
+        university.setNextState({'from': accounts[0]})
+        semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+        university.markStudent(semester.seatTokenId(course_id, 1), mark, {'from': accounts[1]})
+        with reverts("The semester is not closed yet!"):
+            student.transcriptAt(1, university.semesterId())
+        # the semester is closed by its move to the off season
+        tx = university.setNextState({'from': accounts[0]})
+        assert tx.events['SemesterClosed']['semesterId'] == university.semesterId()
+    assert student.transcriptAt(1, 1) == (5, 5)
+    assert student.transcriptAt(1, 2) == (9, 8)
+    assert student.transcriptAt(2, 2) == (0, 0)
+
+def test_set_base_uri(mode):
+    university = deploy_university(mode)
+    with reverts("Ownable: caller is not the owner"):
+        university.setBaseURI("https://example.org/", {'from': accounts[1]})
+    university.setBaseURI("https://example.org/", {'from': accounts[0]})
+    for name, container in (("teacher", Person), ("student", Student), ("courseCatalog", CourseCatalog),
+                            ("degree", Degree)):
+        contract = Contract.from_abi(name, getattr(university, name)(), container.abi)
+        assert contract.baseURI() == "https://example.org/"
+
+def test_create_students(mode):
+    university = deploy_university(mode)
+    university.createStudents([accounts[1], accounts[2]], {'from': accounts[0]})
+    university.createTeachers([accounts[3]], {'from': accounts[0]})
+    with reverts("Ownable: caller is not the owner"):
+        university.createStudents([accounts[4]], {'from': accounts[4]})
+    student = Contract.from_abi("Student", university.student(), Student.abi)
+    teacher = Contract.from_abi("Person", university.teacher(), Person.abi)
+    assert student.tokenOf(accounts[2]) == 2
+    assert teacher.tokenOf(accounts[3]) == 1
+    university.createNewSemester({'from': accounts[0]})
+    with reverts("This is not the off season state!"):
+        university.createStudents([accounts[4]], {'from': accounts[0]})
+
+def test_mark_student(mode):
+    university = deploy_university(mode)
+    university.createTeacher(accounts[1])
+    university.createTeacher(accounts[2])
+    university.createStudent(accounts[3])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(5, {'from': accounts[1]})
+    course_catalog.mint(7, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(2, 3, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourse(2, 1, {'from': accounts[3]})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    semester.claim(2, 1, {'from': accounts[3]})
+    university.setNextState({'from': accounts[0]})
+    with reverts("You must be teacher!"):
+        university.markStudent(1, 5, {'from': accounts[3]})
+    with reverts("You are not the owner of the course!"):
+        university.markStudent(1, 5, {'from': accounts[2]})
+    university.markStudent(1, 5, {'from': accounts[1]})
+    assert semester.marks(1) == 5
+    # the credit value belongs to the course of the token, not to the course with the token's id
+    student = Contract.from_abi("Student", university.student(), Student.abi)
+    assert student.students(1)[:2] == (7, 5)
+
+def test_mark_students(mode):
+    university = deploy_university(mode)
+    university.createTeachers([accounts[1], accounts[2]])
+    university.createStudents([accounts[3], accounts[4]])
+    course_catalog = Contract.from_abi("CourseCatalog", university.courseCatalog(), CourseCatalog.abi)
+    course_catalog.mint(6, {'from': accounts[1]})
+    university.createNewSemester({'from': accounts[0]})
+    university.addMyCourseNextSemester(1, 3, {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    university.applyForCourse(1, 1, {'from': accounts[3]})
+    university.applyForCourse(1, 2, {'from': accounts[4]})
+    university.setNextState({'from': accounts[0]})
+    semester = Contract.from_abi("Semester", university.semesters(university.semesterId()), Semester.abi)
+    semester.claim(1, 1, {'from': accounts[3]})
+    semester.claim(1, 2, {'from': accounts[4]})
+    with reverts("This is not the active state!"):
+        university.markStudents(1, [1, 2], [5, 3], {'from': accounts[1]})
+    university.setNextState({'from': accounts[0]})
+    with reverts("You are not the owner of the course!"):
+        university.markStudents(1, [1, 2], [5, 3], {'from': accounts[2]})
+    tx = university.markStudents(1, [1, 2], [5, 3], {'from': accounts[1]})
+    assert len(tx.events['StudentMarked']) == 2
+    assert len(tx.events['Marked']) == 2
+    student = Contract.from_abi("Student", university.student(), Student.abi)
+    assert student.students(1)[:2] == (6, 5)
+    assert student.students(2)[:2] == (6, 3)